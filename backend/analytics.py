@@ -0,0 +1,319 @@
+"""
+Vectorized wellbeing analytics over a user's daily logs.
+
+A user's mood/energy/stress history is read with one query into NumPy arrays
+laid out on a dense daily calendar (days without a log, and values of 0, are
+NaN, matching the "not logged" treatment used by the feedback averages).
+Rolling means, weekly aggregates and day-of-week profiles are then computed
+with cumulative sums and bincounts rather than Python loops.
+
+Routine correlations use the same calendar plus a day x routine completion
+matrix (1 completed, 0 logged but not completed, NaN when the day was not
+logged or the routine was neither scheduled nor recorded). Pearson correlation
+and lift (mean metric on completed minus missed days) for every routine/metric
+pair come out of a handful of masked matrix products, optionally pairing a
+day's completions with wellbeing `lag` days later. Reports are cached keyed on
+the user's daily_logs/routines collection versions, so any new entry misses.
+"""
+from flask import current_app
+import numpy as np
+from models import db, DailyLog, RoutineEntry, Routine, CollectionVersion, WEEKDAYS, ALL_DAYS_MASK
+from ttl_cache import TTLCache
+
+METRICS = ('mood', 'energy', 'stress')
+
+def load_wellbeing_series(user_id, date_from=None, date_to=None):
+    """
+    Load a user's logs into a dense daily calendar.
+
+    Returns:
+        (days, values) - days is a datetime64[D] array from the first to the last logged date within
+        date_from..date_to, values a (len(days), 3) float array of mood/energy/stress
+        with NaN where nothing was logged. Both are empty when there are no logs.
+    """
+    query = db.session.query(
+        DailyLog.log_date, DailyLog.mood, DailyLog.energy_level, DailyLog.stress_level
+    ).filter(DailyLog.user_id == user_id)
+    if date_from:
+        query = query.filter(DailyLog.log_date >= date_from)
+    if date_to:
+        query = query.filter(DailyLog.log_date <= date_to)
+    rows = query.order_by(DailyLog.log_date).all()
+
+    if not rows:
+        return np.array([], dtype='datetime64[D]'), np.empty((0, len(METRICS)))
+
+    logged = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    raw = np.array([row[1:] for row in rows], dtype=float)  # None becomes NaN
+    raw[raw == 0] = np.nan
+
+    # Only the logged span: the requested range may be far wider than the history
+    days = np.arange(logged[0], logged[-1] + 1)
+    values = np.full((len(days), len(METRICS)), np.nan)
+    values[(logged - days[0]).astype(int)] = raw
+    return days, values
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` days per column, ignoring NaN (NaN where the window is empty)"""
+    present = ~np.isnan(values)
+    sums = np.vstack([np.zeros(values.shape[1]), np.cumsum(np.where(present, values, 0.0), axis=0)])
+    counts = np.vstack([np.zeros(values.shape[1]), np.cumsum(present, axis=0)])
+    lagged = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    window_sums = sums[1:] - sums[lagged]
+    window_counts = counts[1:] - counts[lagged]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+def _grouped_means(groups, values, size):
+    """Per-group NaN-ignoring means of each column, plus the number of days with any value"""
+    present = ~np.isnan(values)
+    means = np.full((size, values.shape[1]), np.nan)
+    for col in range(values.shape[1]):
+        sums = np.bincount(groups, weights=np.where(present[:, col], values[:, col], 0.0), minlength=size)
+        counts = np.bincount(groups, weights=present[:, col], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[:, col] = np.where(counts > 0, sums / counts, np.nan)
+    days_logged = np.bincount(groups, weights=present.any(axis=1), minlength=size).astype(int)
+    return means, days_logged
+
+def _weekday_index(days):
+    # 1970-01-01 was a Thursday (weekday 3)
+    return (days.astype('int64') + 3) % 7
+
+def _clean(array):
+    """Round to 2 decimals and turn NaN into None for JSON"""
+    return [None if np.isnan(v) else round(float(v), 2) for v in array]
+
+def _metric_dict(row):
+    return dict(zip(METRICS, _clean(row)))
+
+def wellbeing_report(user_id, date_from=None, date_to=None, window=7):
+    """Rolling means, weekly aggregates and day-of-week profile of a user's wellbeing"""
+    days, values = load_wellbeing_series(user_id, date_from, date_to)
+    report = {
+        'from': str(days[0]) if len(days) else (date_from.isoformat() if date_from else None),
+        'to': str(days[-1]) if len(days) else (date_to.isoformat() if date_to else None),
+        'window': window,
+        'days_logged': 0,
+        'summary': {metric: None for metric in METRICS},
+        'rolling': {'dates': [], **{metric: [] for metric in METRICS}},
+        'weekly': [],
+        'day_of_week': [],
+    }
+    if not len(days):
+        return report
+
+    present = ~np.isnan(values)
+    report['days_logged'] = int(present.any(axis=1).sum())
+    for col, metric in enumerate(METRICS):
+        column = values[present[:, col], col]
+        report['summary'][metric] = {
+            'mean': round(float(column.mean()), 2),
+            'std': round(float(column.std()), 2),
+            'min': float(column.min()),
+            'max': float(column.max()),
+            'days': int(column.size),
+        } if column.size else None
+
+    rolled = rolling_mean(values, window)
+    report['rolling'] = {
+        'dates': [str(d) for d in days],
+        **{metric: _clean(rolled[:, col]) for col, metric in enumerate(METRICS)}
+    }
+
+    # Weeks start on Monday; week 0 is the week containing the first day
+    weekdays = _weekday_index(days)
+    weeks = (np.arange(len(days)) + weekdays[0]) // 7
+    week_means, week_days = _grouped_means(weeks, values, int(weeks[-1]) + 1)
+    first_monday = days[0] - np.timedelta64(int(weekdays[0]), 'D')
+    report['weekly'] = [
+        {
+            'week_start': str(first_monday + np.timedelta64(7 * week, 'D')),
+            'days_logged': int(week_days[week]),
+            **_metric_dict(week_means[week])
+        }
+        for week in range(len(week_means)) if week_days[week]
+    ]
+
+    dow_means, dow_days = _grouped_means(weekdays, values, 7)
+    report['day_of_week'] = [
+        {'weekday': WEEKDAYS[day], 'days_logged': int(dow_days[day]), **_metric_dict(dow_means[day])}
+        for day in range(7)
+    ]
+    return report
+
+# ---------------------- Routine correlations ----------------------
+
+MIN_PAIRED_DAYS = 7  # Fewer paired days than this report no correlation
+MIN_GROUP_DAYS = 2  # Lift needs at least this many completed and missed days
+MAX_LAG = 14
+
+def init_analytics_cache(app):
+    """Create the correlation report cache for this app (called from create_app)"""
+    cache = None
+    if app.config.get('ANALYTICS_CACHE_ENABLED'):
+        cache = TTLCache(
+            maxsize=app.config.get('ANALYTICS_CACHE_MAX_ENTRIES', 1000),
+            ttl=app.config.get('ANALYTICS_CACHE_TTL', 3600)
+        )
+    app.extensions['analytics_cache'] = cache
+
+def load_completion_matrix(user_id, date_from=None, date_to=None):
+    """
+    Load a user's logs and routine entries into dense NumPy arrays with one query.
+
+    Returns:
+        (days, values, routines, completion) - days/values as for load_wellbeing_series,
+        routines a list of (id, name) for every routine with an entry in range, and
+        completion a (len(days), len(routines)) float array of 1/0/NaN.
+    """
+    query = db.session.query(
+        DailyLog.log_date, DailyLog.mood, DailyLog.energy_level, DailyLog.stress_level,
+        RoutineEntry.routine_id, RoutineEntry.status, Routine.name, Routine.days_mask
+    ).outerjoin(
+        RoutineEntry, RoutineEntry.daily_log_id == DailyLog.id
+    ).outerjoin(
+        Routine, Routine.id == RoutineEntry.routine_id
+    ).filter(DailyLog.user_id == user_id)
+    if date_from:
+        query = query.filter(DailyLog.log_date >= date_from)
+    if date_to:
+        query = query.filter(DailyLog.log_date <= date_to)
+    rows = query.all()
+
+    if not rows:
+        return np.array([], dtype='datetime64[D]'), np.empty((0, len(METRICS))), [], np.empty((0, 0))
+
+    logged = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    raw = np.array([row[1:4] for row in rows], dtype=float)
+    raw[raw == 0] = np.nan
+    days = np.arange(logged.min(), logged.max() + 1)
+    day_index = (logged - days[0]).astype(int)
+    values = np.full((len(days), len(METRICS)), np.nan)
+    values[day_index] = raw
+    was_logged = np.zeros(len(days), dtype=bool)
+    was_logged[day_index] = True
+
+    routine_info = {}
+    for row in rows:
+        if row[4] is not None:
+            routine_info[row[4]] = (row[6], row[7])
+    routine_ids = np.array(sorted(routine_info), dtype=int)
+    routines = [(int(rid), routine_info[rid][0]) for rid in routine_ids]
+
+    # Logged days a routine was scheduled on count as missed unless an entry says otherwise
+    masks = np.array([
+        routine_info[rid][1] if routine_info[rid][1] is not None else ALL_DAYS_MASK for rid in routine_ids
+    ], dtype=int)
+    scheduled = (masks[None, :] >> _weekday_index(days)[:, None]) & 1 == 1
+    completion = np.full((len(days), len(routines)), np.nan)
+    completion[was_logged[:, None] & scheduled] = 0.0
+
+    entry_rows = [row for row in rows if row[4] is not None]
+    if entry_rows:
+        entry_days = day_index[[i for i, row in enumerate(rows) if row[4] is not None]]
+        entry_cols = np.searchsorted(routine_ids, [row[4] for row in entry_rows])
+        completion[entry_days, entry_cols] = [row[5] == 'completed' for row in entry_rows]
+    return days, values, routines, completion
+
+def correlate(completion, values, lag=0):
+    """
+    Correlation and lift of every routine column against every metric column.
+
+    Pairs completion on day d with values on day d + lag, using only days where both
+    are present. Returns a dict of (routines, metrics) arrays: correlation, lift,
+    paired_days, completed_days.
+    """
+    n_days = len(completion) - lag
+    if n_days <= 0:
+        shape = (completion.shape[1], values.shape[1])
+        return {
+            'correlation': np.full(shape, np.nan), 'lift': np.full(shape, np.nan),
+            'paired_days': np.zeros(shape, dtype=int), 'completed_days': np.zeros(shape, dtype=int)
+        }
+    c = completion[:n_days]
+    w = values[lag:lag + n_days]
+    c_present, w_present = (~np.isnan(c)).astype(float), (~np.isnan(w)).astype(float)
+    c0, w0 = np.nan_to_num(c), np.nan_to_num(w)
+
+    # Sums over the days where both sides are present, for every pair at once
+    n = c_present.T @ w_present
+    sum_c = c0.T @ w_present  # completions are 0/1, so this is also the completed-day count
+    sum_w = c_present.T @ w0
+    sum_cw = c0.T @ w0
+    sum_ww = c_present.T @ (w0 * w0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_cw - sum_c * sum_w / n
+        var_c = sum_c - sum_c * sum_c / n
+        var_w = sum_ww - sum_w * sum_w / n
+        correlation = cov / np.sqrt(var_c * var_w)
+        lift = sum_cw / sum_c - (sum_w - sum_cw) / (n - sum_c)
+
+    # Near-constant columns leave rounding noise in the variances rather than exact zeros
+    correlation[(n < MIN_PAIRED_DAYS) | (var_c <= 1e-9) | (var_w <= 1e-9)] = np.nan
+    lift[(sum_c < MIN_GROUP_DAYS) | (n - sum_c < MIN_GROUP_DAYS)] = np.nan
+    return {
+        'correlation': np.clip(correlation, -1.0, 1.0),
+        'lift': lift,
+        'paired_days': n.astype(int),
+        'completed_days': sum_c.astype(int),
+    }
+
+def _collection_versions(user_id, collections):
+    rows = db.session.query(CollectionVersion.collection, CollectionVersion.version).filter(
+        CollectionVersion.user_id == user_id,
+        CollectionVersion.collection.in_(collections)
+    ).all()
+    versions = dict(rows)
+    return tuple(versions.get(name, 0) for name in collections)
+
+def correlation_report(user_id, date_from=None, date_to=None, lags=(0,)):
+    """
+    Routine vs mood/energy/stress correlations, served from the cache until the
+    user's logs, entries or routines change.
+    """
+    lags = tuple(sorted(set(lags)))
+    cache = current_app.extensions.get('analytics_cache')
+    key = None
+    if cache is not None:
+        key = (user_id, date_from, date_to, lags, _collection_versions(user_id, ('daily_logs', 'routines')))
+        report = cache.get(key)
+        if report is not None:
+            return report
+
+    days, values, routines, completion = load_completion_matrix(user_id, date_from, date_to)
+    results = {lag: correlate(completion, values, lag) for lag in lags}
+    tracked = (~np.isnan(completion)).sum(axis=0)
+    completed = np.nansum(completion, axis=0)
+
+    report = {
+        'from': str(days[0]) if len(days) else None,
+        'to': str(days[-1]) if len(days) else None,
+        'lags': list(lags),
+        'min_paired_days': MIN_PAIRED_DAYS,
+        'routines': [
+            {
+                'routine_id': routine_id,
+                'name': name,
+                'days_tracked': int(tracked[col]),
+                'completion_rate': round(100 * float(completed[col]) / tracked[col], 1) if tracked[col] else None,
+                'by_lag': {
+                    str(lag): {
+                        metric: {
+                            'correlation': _clean([result['correlation'][col, m]])[0],
+                            'lift': _clean([result['lift'][col, m]])[0],
+                            'paired_days': int(result['paired_days'][col, m]),
+                            'completed_days': int(result['completed_days'][col, m]),
+                        }
+                        for m, metric in enumerate(METRICS)
+                    }
+                    for lag, result in results.items()
+                }
+            }
+            for col, (routine_id, name) in enumerate(routines)
+        ]
+    }
+    if cache is not None:
+        cache.set(key, report)
+    return report
@@ -3,10 +3,22 @@ from flask_cors import CORS
 from models import db
 from flask_migrate import Migrate
 from config import config
-from routes.auth import auth_bp
+from jobs import init_job_queue
+from llm_cache import init_llm_cache
+from llm import init_llm
+from passwords import init_password_hasher
+from query_stats import init_query_stats
+from etags import init_etags
+from changes import init_changes
+from analytics import init_analytics_cache
+from routes.auth import auth_bp, init_auth_cache
 from routes.routines import routines_bp
 from routes.daily_logs import daily_logs_bp
 from routes.feedback import feedback_bp
+from routes.sync import sync_bp
+from routes.analytics import analytics_bp
+from routes.export import export_bp
+from routes.imports import import_bp
 import os
 
 def create_app(config_name=None):
@@ -20,15 +32,34 @@ def create_app(config_name=None):
     # Initialize database
     db.init_app(app)
     Migrate(app, db)
+    init_query_stats(app)
+    init_etags(app)
+    init_changes(app)
     
     # Enable CORS
     CORS(app)
     
+    # Background feedback generation workers
+    init_job_queue(app)
+    
+    # Process-local caches (authenticated users, analytics reports) and the password hashing pool
+    init_auth_cache(app)
+    init_password_hasher(app)
+    init_analytics_cache(app)
+    
+    # Shared LLM client and the local cache in front of it
+    init_llm(app)
+    init_llm_cache(app)
+    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(routines_bp)
     app.register_blueprint(daily_logs_bp)
     app.register_blueprint(feedback_bp)
+    app.register_blueprint(sync_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(import_bp)
     
     with app.app_context():
         db.create_all()
@@ -38,6 +69,19 @@ def create_app(config_name=None):
     def health_check():
         return {'status': 'ok', 'message': 'Mentor app backend is running'}, 200
     
+    # Runtime counters for caches and worker pools
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        llm_cache = app.extensions.get('llm_cache')
+        auth_cache = app.extensions.get('auth_cache')
+        analytics_cache = app.extensions.get('analytics_cache')
+        return {
+            'llm_cache': llm_cache.stats() if llm_cache else None,
+            'auth_cache': auth_cache.stats() if auth_cache else None,
+            'analytics_cache': analytics_cache.stats() if analytics_cache else None,
+            'password_hashing': app.extensions['password_hasher'].stats()
+        }, 200
+    
     return app
 
 if __name__ == '__main__':
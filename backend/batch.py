@@ -0,0 +1,76 @@
+"""
+Process-pool plumbing for batch commands.
+
+Each worker process builds its own app (and therefore its own DB engine) once,
+from a copy of the parent app's config, then runs the work function it is handed
+inside an app context. Work functions must be importable module-level callables
+so they can be sent to the workers.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from flask import current_app
+import multiprocessing
+import pickle
+
+_worker_app = None
+
+def _worker_settings():
+    """The current app's config values that can be sent to a spawned process"""
+    settings = {}
+    for key, value in current_app.config.items():
+        if not key.isupper():
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        settings[key] = value
+    return settings
+
+def _init_worker(settings):
+    global _worker_app
+    from app import create_app
+    from config import config
+    # The parent's config may be a testing/custom one the worker cannot look up by name
+    config['batch_worker'] = type('BatchWorkerConfig', (), settings)
+    _worker_app = create_app('batch_worker')
+
+def _run_in_worker(work_fn, *args):
+    with _worker_app.app_context():
+        return work_fn(*args)
+
+def partition(weights, parts):
+    """
+    Split keys into at most `parts` buckets of roughly equal total weight.
+
+    Args:
+        weights: Dict of key -> weight (e.g. user id -> pending log count)
+        parts: Number of buckets
+    """
+    buckets = [[] for _ in range(max(1, parts))]
+    totals = [0] * len(buckets)
+    # Greedy: heaviest keys first, each into the currently lightest bucket
+    for key, weight in sorted(weights.items(), key=lambda kv: kv[1], reverse=True):
+        i = totals.index(min(totals))
+        buckets[i].append(key)
+        totals[i] += weight
+    return [b for b in buckets if b]
+
+def run_partitioned(work_fn, partitions, workers, *args):
+    """
+    Run work_fn(partition, *args) for every partition across a process pool.
+    Yields each result as it completes. The caller must be inside an app context;
+    workers are built with its config, and when workers <= 1 everything runs in
+    this process.
+    """
+    if workers <= 1:
+        for part in partitions:
+            yield work_fn(part, *args)
+        return
+
+    # spawn avoids inheriting open DB connections and worker threads from the parent
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(_worker_settings(),)) as pool:
+        futures = [pool.submit(_run_in_worker, work_fn, part, *args) for part in partitions]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,119 @@
+"""
+Shared timing, reporting and baseline comparison for the benchmarks.
+
+Every benchmark writes a JSON document of the form
+    {"benchmark": name, "params": {...}, "environment": {...}, "results": [...]}
+where each result has a unique "name" and latency fields in milliseconds.
+compare_to_baseline() matches results by name and flags any whose median got
+slower than the allowed ratio.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig
+
+BENCHMARK_PASSWORD = 'benchmark'
+
+class BenchmarkConfig(TestingConfig):
+    """Testing config with caches that would hide the measured work turned off"""
+    LLM_CACHE_ENABLED = False
+    ANALYTICS_CACHE_ENABLED = False
+    QUERY_BUDGET = 10 ** 6  # Don't log budget warnings for every seeded request
+
+def login(client, username, register=True):
+    """Auth headers for a user, registering them first unless they already exist"""
+    if register:
+        client.post('/api/auth/register', json={'username': username, 'password': BENCHMARK_PASSWORD})
+    response = client.post('/api/auth/login', json={'username': username, 'password': BENCHMARK_PASSWORD})
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+def summarize(name, timings, **extra):
+    """Latency summary (ms) of a list of per-call durations in ms"""
+    ordered = sorted(timings)
+    return {
+        'name': name,
+        'iterations': len(ordered),
+        'mean_ms': statistics.mean(ordered),
+        'p50_ms': statistics.median(ordered),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99),
+        'min_ms': ordered[0],
+        'max_ms': ordered[-1],
+        'stdev_ms': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        **extra
+    }
+
+def time_call(name, fn, iterations=50, warmup=3, **extra):
+    """Call fn() warmup + iterations times and summarize the timed calls"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return summarize(name, timings, **extra)
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+def write_results(path, benchmark, params, results):
+    document = {'benchmark': benchmark, 'params': params, 'environment': environment(), 'results': results}
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return document
+
+def compare_to_baseline(results, baseline_path, max_ratio=1.25, metric='p50_ms'):
+    """
+    Compare results to a stored run by name.
+
+    Returns:
+        List of comparison dicts (name, baseline, current, ratio, regressed) for the
+        results present in both runs
+    """
+    with open(baseline_path) as f:
+        baseline = {r['name']: r for r in json.load(f)['results']}
+    comparisons = []
+    for result in results:
+        before = baseline.get(result['name'])
+        if before is None or not before.get(metric):
+            continue
+        ratio = result[metric] / before[metric]
+        comparisons.append({
+            'name': result['name'],
+            'baseline': before[metric],
+            'current': result[metric],
+            'ratio': ratio,
+            'regressed': ratio > max_ratio,
+        })
+    return comparisons
+
+def print_results(results):
+    width = max(len(r['name']) for r in results) if results else 0
+    for r in results:
+        queries = f", {r['queries']} queries" if r.get('queries') is not None else ''
+        print(f"{r['name']:<{width}}  p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+              f"mean {r['mean_ms']:8.2f} ms{queries}")
+
+def print_comparisons(comparisons, max_ratio):
+    for c in comparisons:
+        flag = 'REGRESSED' if c['regressed'] else 'ok'
+        print(f"{c['name']}: {c['baseline']:.2f} -> {c['current']:.2f} ms ({c['ratio']:.2f}x) {flag}")
+    regressed = [c for c in comparisons if c['regressed']]
+    if regressed:
+        print(f"{len(regressed)} result(s) slower than {max_ratio:.2f}x the baseline")
+    return regressed
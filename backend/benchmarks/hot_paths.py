@@ -0,0 +1,160 @@
+"""
+Micro-benchmarks of the feedback and analytics hot paths at realistic scale.
+
+Seeds a synthetic SQLite dataset (see benchmarks.seed), then times
+analyze_historical_performance, build_feedback_prompt, generate_mentor_feedback,
+generate_suggestions, the analytics reports and the list endpoints (through the
+Flask test client) for one seeded user. Database-backed functions run with a
+fresh session per call so the identity map does not answer for the database.
+The LLM is not called; caches that would hide the measured work are disabled.
+
+Usage (from backend/):
+    python -m benchmarks.hot_paths --users 5 --days 365 --routines 8 --output results.json
+    python -m benchmarks.hot_paths --output new.json --baseline results.json --max-ratio 1.25
+
+Exits with status 1 when any result's median is slower than --max-ratio x the baseline.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import config
+from models import db, User, DailyLog
+from benchmarks.harness import (
+    BenchmarkConfig, login, time_call, write_results, compare_to_baseline, print_results, print_comparisons
+)
+from benchmarks.seed import seed
+
+ENDPOINTS = [
+    ('GET /api/routines', '/api/routines'),
+    ('GET /api/routines/due', '/api/routines/due'),
+    ('GET /api/daily-logs', '/api/daily-logs'),
+    ('GET /api/daily-logs/date/<latest>', '/api/daily-logs/date/{latest}'),
+    ('GET /api/feedback', '/api/feedback'),
+    ('GET /api/analytics/wellbeing', '/api/analytics/wellbeing'),
+    ('GET /api/analytics/correlations', '/api/analytics/correlations?lag=0,1'),
+    ('GET /api/sync', '/api/sync'),
+]
+
+def _fresh_session(fn):
+    """Run fn, then discard the session so the next call reads from the database again"""
+    def call():
+        try:
+            return fn()
+        finally:
+            db.session.remove()
+    return call
+
+def bench_functions(app, username, iterations):
+    from routes.feedback import (
+        analyze_historical_performance, load_routine_entries, calculate_compliance_rate,
+        get_top_performer, get_biggest_miss, generate_mentor_feedback, generate_suggestions
+    )
+    from prompts import build_feedback_prompt
+    from analytics import wellbeing_report, correlation_report
+
+    with app.app_context():
+        user = User.query.filter_by(username=username).one()
+        user_id = user.id
+        log = DailyLog.query.filter_by(user_id=user_id).order_by(DailyLog.log_date.desc()).first()
+        entries = load_routine_entries(log)
+        historical = analyze_historical_performance(user)
+        correlations = correlation_report(user_id, lags=(0, 1))
+        compliance = calculate_compliance_rate(entries)
+        top, miss = get_top_performer(entries), get_biggest_miss(entries)
+        name = user.first_name or user.username
+
+        def analyze():
+            return analyze_historical_performance(db.session.get(User, user_id))
+
+        return [
+            time_call('analyze_historical_performance', _fresh_session(analyze), iterations),
+            time_call('build_feedback_prompt', lambda: build_feedback_prompt(
+                user, log, historical, entries
+            ), iterations),
+            time_call('build_feedback_prompt+correlations', lambda: build_feedback_prompt(
+                user, log, historical, entries, correlations=correlations
+            ), iterations),
+            time_call('generate_mentor_feedback', lambda: generate_mentor_feedback(
+                compliance, log.mood or 5, log.energy_level or 5, log.stress_level or 5, top, miss, name, historical
+            ), iterations),
+            time_call('generate_suggestions', lambda: generate_suggestions(
+                compliance, log.energy_level or 5, log.stress_level or 5, entries, historical
+            ), iterations),
+            time_call('wellbeing_report', _fresh_session(lambda: wellbeing_report(user_id)), iterations),
+            time_call('correlation_report', _fresh_session(
+                lambda: correlation_report(user_id, lags=(0, 1))
+            ), iterations),
+        ]
+
+def bench_endpoints(app, username, iterations):
+    client = app.test_client()
+    headers = login(client, username, register=False)
+    with app.app_context():
+        latest = db.session.query(db.func.max(DailyLog.log_date)).join(User).filter(
+            User.username == username
+        ).scalar()
+
+    results = []
+    for name, path in ENDPOINTS:
+        path = path.format(latest=latest.isoformat())
+        queries = []
+
+        def request():
+            response = client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f'{path} returned {response.status_code}')
+            queries.append(int(response.headers.get('X-Query-Count', 0)))
+
+        result = time_call(name, request, iterations)
+        result['queries'] = max(queries)
+        results.append(result)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--routines', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --output file')
+    parser.add_argument('--max-ratio', type=float, default=1.25,
+                        help='Flag results whose p50 exceeds this multiple of the baseline')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        class HotPathConfig(BenchmarkConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}"
+
+        config['benchmark_hot_paths'] = HotPathConfig
+        app = create_app('benchmark_hot_paths')
+        with app.app_context():
+            started = time.perf_counter()
+            usernames, rows = seed(args.users, args.days, args.routines, args.seed)
+            print(f"Seeded {rows} row(s) in {time.perf_counter() - started:.1f}s")
+
+        results = bench_functions(app, usernames[0], args.iterations)
+        results += bench_endpoints(app, usernames[0], args.iterations)
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    print_results(results)
+    params = {key: getattr(args, key) for key in ('users', 'days', 'routines', 'seed', 'iterations')}
+    if args.output:
+        write_results(args.output, 'hot_paths', params, results)
+
+    if args.baseline:
+        regressed = print_comparisons(compare_to_baseline(results, args.baseline, args.max_ratio), args.max_ratio)
+        if regressed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
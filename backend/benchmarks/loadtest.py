@@ -0,0 +1,219 @@
+"""
+Concurrent HTTP load test against a running server.
+
+Each virtual user plays one realistic day end to end: register, log in,
+generate starter routines (LLM), fetch the routines due today, create today's
+log, save all routine entries in one bulk call, revise one entry, request
+feedback (LLM, via a background job) and poll until it is ready, then load the
+log and feedback lists. --concurrency users run at once until --users have
+finished. Every request is timed and grouped by route; the report gives
+throughput, p50/p95/p99 latency and the error rate per route, plus the
+end-to-end time to feedback.
+
+Point the server's LLM at a local stand-in so the run measures this code
+rather than a remote API, e.g. (from backend/):
+    python -m benchmarks.mock_llm --port 8001 --profile realistic
+    DATABASE_URL=sqlite:///load.sqlite3 OPENAI_API_KEY=local OPENAI_BASE_URL=http://127.0.0.1:8001/v1 \\
+        flask --app app run --port 5000 --with-threads
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:5000 --users 200 --concurrency 20 --output load.json
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from benchmarks.harness import (
+    BENCHMARK_PASSWORD, summarize, write_results, compare_to_baseline, print_comparisons
+)
+
+FEEDBACK_POLL_INTERVAL = 0.25  # seconds
+FEEDBACK_TIMEOUT = 60.0  # seconds a user waits for their feedback job
+
+class Recorder:
+    """Thread-safe per-route latency and error bookkeeping"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, elapsed_ms, status, ok):
+        with self._lock:
+            self.timings[route].append(elapsed_ms)
+            self.statuses[route][str(status)] += 1
+            if not ok:
+                self.errors[route] += 1
+
+class ScenarioError(Exception):
+    """A step failed, so the rest of this user's day cannot run"""
+
+class VirtualUser:
+    def __init__(self, client, recorder, username):
+        self.client = client
+        self.recorder = recorder
+        self.username = username
+        self.headers = {}
+
+    def call(self, method, route, path, expected=(200,), **kwargs):
+        """Send one request, recording it under `route`. Returns the parsed JSON body."""
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(route, (time.perf_counter() - started) * 1000, type(e).__name__, False)
+            raise ScenarioError(f'{route}: {e}')
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok = response.status_code in expected
+        self.recorder.record(route, elapsed_ms, response.status_code, ok)
+        if not ok:
+            raise ScenarioError(f'{route}: HTTP {response.status_code}')
+        return response.json() if response.content else {}
+
+    def run(self, with_feedback=True):
+        self.call('POST', 'POST /api/auth/register', '/api/auth/register', expected=(201,),
+                  json={'username': self.username, 'password': BENCHMARK_PASSWORD})
+        token = self.call('POST', 'POST /api/auth/login', '/api/auth/login',
+                          json={'username': self.username, 'password': BENCHMARK_PASSWORD})['token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+        self.call('POST', 'POST /api/routines/generate-ai', '/api/routines/generate-ai', expected=(200, 201), json={
+            'goals': 'get fit, read more and sleep better',
+            'challenges': 'long work days',
+            'unavailable_times': '9-5 PM',
+            'desired_routines': 'running, reading, meditation',
+        })
+        routines = self.call('GET', 'GET /api/routines/due', '/api/routines/due')['routines']
+
+        log_id = self.call('POST', 'POST /api/daily-logs', '/api/daily-logs', expected=(201,), json={
+            'mood': 7, 'energy_level': 6, 'stress_level': 4, 'notes': 'Load test day'
+        })['log_id']
+        saved = self.call('PUT', 'PUT /api/daily-logs/<id>/routine-entries', f'/api/daily-logs/{log_id}/routine-entries',
+                          json=[{
+                              'routine_id': routine['id'],
+                              'status': 'completed' if i % 3 else 'partial',
+                              'completion_percentage': 100 if i % 3 else 50,
+                              'actual_duration': routine.get('target_duration') or 30,
+                          } for i, routine in enumerate(routines)])
+        entry_ids = [r['entry_id'] for r in saved['results'] if r.get('entry_id')]
+        if entry_ids:
+            self.call('PUT', 'PUT /api/daily-logs/routine-entry/<id>',
+                      f"/api/daily-logs/routine-entry/{entry_ids[0]}",
+                      json={'status': 'completed', 'completion_percentage': 100, 'difficulty_felt': 6})
+
+        if with_feedback:
+            started = time.perf_counter()
+            body = self.call('POST', 'POST /api/feedback/generate/<id>', f'/api/feedback/generate/{log_id}',
+                             expected=(200, 202))
+            job = body.get('job')
+            while job and job['status'] not in ('succeeded', 'failed'):
+                if time.perf_counter() - started > FEEDBACK_TIMEOUT:
+                    self.recorder.record('feedback (end to end)', FEEDBACK_TIMEOUT * 1000, 'timeout', False)
+                    raise ScenarioError('feedback job did not finish')
+                time.sleep(FEEDBACK_POLL_INTERVAL)
+                job = self.call('GET', 'GET /api/feedback/jobs/<id>', f"/api/feedback/jobs/{job['id']}")['job']
+            succeeded = job is None or job['status'] == 'succeeded'
+            self.recorder.record('feedback (end to end)', (time.perf_counter() - started) * 1000,
+                                 'succeeded' if succeeded else 'failed', succeeded)
+
+        self.call('GET', 'GET /api/daily-logs', '/api/daily-logs')
+        self.call('GET', 'GET /api/feedback', '/api/feedback')
+
+def run_load(base_url, users, concurrency, timeout=30.0, with_feedback=True, prefix=None):
+    """
+    Run `users` scenarios with `concurrency` workers.
+
+    Returns:
+        (results, elapsed seconds, scenario failures)
+    """
+    recorder = Recorder()
+    prefix = prefix or f'load_{int(time.time())}'
+    local = threading.local()
+    clients = []
+    clients_lock = threading.Lock()
+    failures = []
+
+    def client():
+        # One keep-alive connection per worker thread
+        if not hasattr(local, 'client'):
+            local.client = httpx.Client(base_url=base_url, timeout=timeout)
+            with clients_lock:
+                clients.append(local.client)
+        return local.client
+
+    def scenario(i):
+        try:
+            VirtualUser(client(), recorder, f'{prefix}_{i}').run(with_feedback)
+        except ScenarioError as e:
+            with clients_lock:
+                failures.append(str(e))
+        except Exception as e:
+            # An unexpected response body; keep the other users going
+            with clients_lock:
+                failures.append(f'{type(e).__name__}: {e}')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(scenario, range(users)))
+    elapsed = time.perf_counter() - started
+    for c in clients:
+        c.close()
+
+    results = []
+    for route, timings in sorted(recorder.timings.items()):
+        results.append(summarize(
+            route, timings,
+            throughput_rps=len(timings) / elapsed,
+            errors=recorder.errors[route],
+            error_rate=recorder.errors[route] / len(timings),
+            statuses=dict(recorder.statuses[route]),
+        ))
+    return results, elapsed, failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=50, help='Virtual users (scenarios) to run in total')
+    parser.add_argument('--concurrency', type=int, default=10, help='Virtual users running at once')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--no-feedback', action='store_true', help='Skip the feedback generation step')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --output file')
+    parser.add_argument('--max-ratio', type=float, default=1.25,
+                        help='Flag routes whose p50 exceeds this multiple of the baseline')
+    args = parser.parse_args(argv)
+
+    results, elapsed, failures = run_load(
+        args.base_url, args.users, args.concurrency, args.timeout, with_feedback=not args.no_feedback
+    )
+
+    requests = sum(r['iterations'] for r in results if not r['name'].startswith('feedback'))
+    print(f"{args.users} user(s) x 1 day at concurrency {args.concurrency}: {requests} request(s) in {elapsed:.1f}s "
+          f"({requests / elapsed:.1f} req/s), {len(failures)} scenario failure(s)")
+    width = max((len(r['name']) for r in results), default=0)
+    for r in results:
+        print(f"{r['name']:<{width}}  n {r['iterations']:5d}  {r['throughput_rps']:7.1f}/s  "
+              f"p50 {r['p50_ms']:8.1f}  p95 {r['p95_ms']:8.1f}  p99 {r['p99_ms']:8.1f} ms  "
+              f"errors {100 * r['error_rate']:5.1f}%")
+    for failure in sorted(set(failures))[:10]:
+        print(f"  {failure}", file=sys.stderr)
+
+    if args.output:
+        params = {key: getattr(args, key) for key in ('base_url', 'users', 'concurrency', 'timeout', 'no_feedback')}
+        params['elapsed_seconds'] = elapsed
+        params['scenario_failures'] = len(failures)
+        write_results(args.output, 'loadtest', params, results)
+
+    if args.baseline:
+        regressed = print_comparisons(compare_to_baseline(results, args.baseline, args.max_ratio), args.max_ratio)
+        if regressed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,425 @@
+"""
+OpenAI-compatible stand-in LLM server for offline tests, benchmarks and load tests.
+
+Serves POST /v1/chat/completions (streaming and non-streaming) and GET /v1/models.
+Replies are chosen from the request's system prompt: routine generation gets
+schema-valid routine JSON (the structured routine_plan schema in 'single' mode,
+any other json_schema response_format gets a generic instance of its schema),
+routine summaries get a paragraph, and everything else gets mentor-style
+feedback text. Replies are deterministic for a given prompt and --seed.
+
+Timing and failures follow a profile (overridable flag by flag):
+    --latency-ms / --latency-jitter-ms / --latency-distribution  time to first token
+    --tokens-per-second                                          generation speed (0 = instant)
+    --error-rate / --error-statuses                              injected 429/500/503 replies
+    --timeout-rate / --hang-seconds                              requests that never answer in time
+    --stream-abort-rate                                          streams cut off mid-reply
+GET /stats reports what was served and injected.
+
+Usage (from backend/):
+    python -m benchmarks.mock_llm --port 8001 --profile realistic
+    OPENAI_API_KEY=local OPENAI_BASE_URL=http://127.0.0.1:8001/v1 python -m benchmarks.routine_generation
+
+In-process (tests/benchmarks): server = start_mock_llm(port=0, profile='fast'); server.base_url; server.shutdown()
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import (
+    DEFAULT_ROUTINE_SYSTEM_PROMPT, ROUTINE_SUMMARY_SYSTEM_PROMPT, ROUTINE_PLAN_SYSTEM_PROMPT
+)
+
+PROFILES = {
+    'instant': dict(latency_ms=0, latency_jitter_ms=0, latency_distribution='fixed', tokens_per_second=0,
+                    error_rate=0.0, timeout_rate=0.0, stream_abort_rate=0.0),
+    'fast': dict(latency_ms=50, latency_jitter_ms=10, latency_distribution='normal', tokens_per_second=500,
+                 error_rate=0.0, timeout_rate=0.0, stream_abort_rate=0.0),
+    'realistic': dict(latency_ms=400, latency_jitter_ms=200, latency_distribution='lognormal', tokens_per_second=60,
+                      error_rate=0.01, timeout_rate=0.0, stream_abort_rate=0.0),
+    'slow': dict(latency_ms=2000, latency_jitter_ms=1000, latency_distribution='lognormal', tokens_per_second=20,
+                 error_rate=0.0, timeout_rate=0.0, stream_abort_rate=0.0),
+    'flaky': dict(latency_ms=400, latency_jitter_ms=200, latency_distribution='lognormal', tokens_per_second=60,
+                  error_rate=0.1, timeout_rate=0.02, stream_abort_rate=0.05),
+}
+
+ROUTINE_LIBRARY = [
+    ('Morning Walk', 'A brisk walk to wake up body and mind.', 'health', 20),
+    ('Focused Work Block', 'One uninterrupted block on the most important task.', 'work', 90),
+    ('Reading', 'Read a book chapter before bed.', 'personal', 25),
+    ('Meditation', 'Ten minutes of breathing to reset stress.', 'health', 10),
+    ('Strength Training', 'Bodyweight or gym strength session.', 'health', 40),
+    ('Call a Friend', 'Catch up with someone who matters.', 'social', 15),
+    ('Plan Tomorrow', 'Write the top three priorities for tomorrow.', 'work', 10),
+]
+
+FEEDBACK_SENTENCES = [
+    "You showed up today, and that is the part most people skip.",
+    "Your completed routines prove the plan works when you work the plan.",
+    "The routine you dodged is the one holding the rest of your week hostage.",
+    "Low energy is information, not an excuse, so shrink the task and do it anyway.",
+    "Stress was high, which makes every box you still checked count double.",
+    "Stop negotiating with yourself at 9 PM; decide at 9 AM and execute.",
+    "Consistency beats intensity, and your streaks are starting to say so.",
+    "Tomorrow, do the hardest routine first before your brain starts filing complaints.",
+    "Nobody is coming to do the reps for you, which is the good news.",
+    "Keep the wins, ditch the excuses, and log it again tomorrow.",
+]
+
+def _tokens(text):
+    """Split text into word-sized pieces, the unit used for pacing and usage counts"""
+    return re.findall(r'\S+\s*|\s+', text) or ['']
+
+def _schema_instance(schema, rng, name='value'):
+    """A minimal instance satisfying a JSON schema (objects, arrays, enums, primitives)"""
+    if 'enum' in schema:
+        return rng.choice(schema['enum'])
+    kind = schema.get('type')
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != 'null'), 'null')
+    if kind == 'object':
+        properties = schema.get('properties', {})
+        required = schema.get('required', list(properties))
+        return {key: _schema_instance(properties[key], rng, key) for key in required if key in properties}
+    if kind == 'array':
+        count = max(schema.get('minItems', 1), min(schema.get('maxItems', 3), 3))
+        return [_schema_instance(schema.get('items', {}), rng, name) for _ in range(count)]
+    if kind == 'integer':
+        return int(schema.get('minimum', 1))
+    if kind == 'number':
+        return float(schema.get('minimum', 1))
+    if kind == 'boolean':
+        return True
+    if kind == 'null':
+        return None
+    return f'mock {name}'
+
+def _desired_routines(user_prompt):
+    match = re.search(r'Desired Routines:\s*(.+)', user_prompt)
+    if not match or match.group(1).strip() == 'None provided':
+        return []
+    return [part.strip().title() for part in re.split(r',|\band\b', match.group(1)) if part.strip()][:4]
+
+def _routines(user_prompt, rng):
+    """4-7 routine objects with exactly the fields the routine prompts and schema ask for"""
+    library = list(ROUTINE_LIBRARY)
+    rng.shuffle(library)
+    picked = [(name, f'Regular {name.lower()} practice.', 'personal', 30) for name in _desired_routines(user_prompt)]
+    names = {p[0].lower() for p in picked}
+    for item in library:
+        if len(picked) >= rng.randint(4, 7):
+            break
+        if item[0].lower() not in names:
+            picked.append(item)
+            names.add(item[0].lower())
+    return [{
+        'name': name,
+        'description': description,
+        'category': category,
+        'frequency': rng.choice(['daily', 'daily', '3x per week', 'weekly']),
+        'target_duration': duration,
+        'priority': rng.randint(3, 10),
+    } for name, description, category, duration in picked]
+
+def _summary(rng):
+    return (
+        "Your goals are clear, and your schedule leaves room for them if you protect a few small windows. "
+        "These routines start small so they survive busy days. "
+        "Health routines anchor your energy, while the work block keeps the important task moving. "
+        "Reflection and planning close the loop so each day informs the next. "
+        f"Give the plan {rng.choice(['two', 'three', 'four'])} weeks before judging it."
+    )
+
+def _feedback(rng):
+    sentences = list(FEEDBACK_SENTENCES)
+    rng.shuffle(sentences)
+    return "SUMMARY: Solid effort with one obvious gap. " + " ".join(sentences[:rng.randint(5, 9)])
+
+def build_reply(body, seed=0):
+    """Reply text for a chat completion request"""
+    messages = body.get('messages') or []
+    system = next((m.get('content') or '' for m in messages if m.get('role') == 'system'), '')
+    user = next((m.get('content') or '' for m in reversed(messages) if m.get('role') == 'user'), '')
+    digest = hashlib.sha256(f'{seed}|{system}|{user}'.encode('utf-8')).hexdigest()
+    rng = random.Random(int(digest[:16], 16))
+
+    response_format = body.get('response_format') or {}
+    if response_format.get('type') == 'json_schema':
+        json_schema = response_format.get('json_schema') or {}
+        if json_schema.get('name') == 'routine_plan' or system == ROUTINE_PLAN_SYSTEM_PROMPT:
+            return json.dumps({'routines': _routines(user, rng), 'summary': _summary(rng)})
+        return json.dumps(_schema_instance(json_schema.get('schema') or {}, rng))
+    if system == DEFAULT_ROUTINE_SYSTEM_PROMPT or response_format.get('type') == 'json_object':
+        return json.dumps({'routines': _routines(user, rng)})
+    if system == ROUTINE_SUMMARY_SYSTEM_PROMPT:
+        return _summary(rng)
+    return _feedback(rng)
+
+class MockProfile:
+    """Timing and failure settings, sampled per request"""
+
+    def __init__(self, latency_ms=0, latency_jitter_ms=0, latency_distribution='fixed', tokens_per_second=0,
+                 error_rate=0.0, error_statuses=(429, 500, 503), timeout_rate=0.0, hang_seconds=120.0,
+                 stream_abort_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.stream_abort_rate = stream_abort_rate
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _random(self):
+        with self._lock:
+            return self._rng.random(), self._rng.gauss(0, 1)
+
+    def first_token_delay(self):
+        """Seconds before the first byte of the reply"""
+        roll, z = self._random()
+        mean, jitter = self.latency_ms, self.latency_jitter_ms
+        if self.latency_distribution == 'fixed' or not jitter:
+            delay = mean
+        elif self.latency_distribution == 'uniform':
+            delay = mean + jitter * (2 * roll - 1)
+        elif self.latency_distribution == 'lognormal' and mean > 0:
+            # Median `mean`, spread such that one sigma is roughly +jitter
+            delay = mean * math.exp(z * math.log1p(jitter / mean))
+        else:
+            delay = mean + jitter * z
+        return max(delay, 0) / 1000
+
+    def token_delay(self):
+        return 1 / self.tokens_per_second if self.tokens_per_second else 0
+
+    def fault(self):
+        """None, 'error', 'timeout' or 'abort' for the next request"""
+        roll, _ = self._random()
+        if roll < self.timeout_rate:
+            return 'timeout'
+        if roll < self.timeout_rate + self.error_rate:
+            return 'error'
+        if roll < self.timeout_rate + self.error_rate + self.stream_abort_rate:
+            return 'abort'
+        return None
+
+    def error_status(self):
+        roll, _ = self._random()
+        return self.error_statuses[int(roll * len(self.error_statuses))]
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('/v1/models', '/models'):
+            self._send_json(200, {'object': 'list', 'data': [
+                {'id': model, 'object': 'model', 'created': 0, 'owned_by': 'mock'} for model in self.server.models
+            ]})
+        elif self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON body', 'type': 'invalid_request_error'}})
+            return
+
+        server = self.server
+        profile = server.profile
+        stream = bool(body.get('stream'))
+        fault = profile.fault()
+        server.count('requests')
+        server.count('streamed' if stream else 'completed')
+
+        if fault == 'timeout':
+            server.count('timeouts')
+            time.sleep(profile.hang_seconds)
+            self.close_connection = True
+            return
+        time.sleep(profile.first_token_delay())
+        if fault == 'error':
+            status = profile.error_status()
+            server.count(f'errors_{status}')
+            self._send_json(status, {'error': {
+                'message': f'Injected mock error ({status})',
+                'type': 'rate_limit_error' if status == 429 else 'server_error',
+                'code': None,
+            }}, headers={'Retry-After': '1'} if status == 429 else None)
+            return
+
+        model = body.get('model') or 'mock-model'
+        reply = build_reply(body, server.seed)
+        tokens = _tokens(reply)
+        prompt_text = ''.join(m.get('content') or '' for m in body.get('messages') or [])
+        usage = {
+            'prompt_tokens': len(_tokens(prompt_text)),
+            'completion_tokens': len(tokens),
+            'total_tokens': len(_tokens(prompt_text)) + len(tokens),
+        }
+        completion_id = f'chatcmpl-mock-{uuid.uuid4().hex[:12]}'
+        created = int(time.time())
+
+        if not stream:
+            time.sleep(profile.token_delay() * len(tokens))
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': reply},
+                    'finish_reason': 'stop',
+                }],
+                'usage': usage,
+            })
+            return
+
+        def chunk(delta, finish_reason=None):
+            return 'data: ' + json.dumps({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }) + '\n\n'
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            self._write_chunk(chunk({'role': 'assistant', 'content': ''}))
+            abort_at = len(tokens) // 2 if fault == 'abort' else None
+            for i, token in enumerate(tokens):
+                if i == abort_at:
+                    server.count('aborted')
+                    self.close_connection = True
+                    return
+                time.sleep(profile.token_delay())
+                self._write_chunk(chunk({'content': token}))
+            self._write_chunk(chunk({}, 'stop'))
+            self._write_chunk('data: [DONE]\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, profile, seed=0, models=('gpt-4o-mini', 'gpt-4'), verbose=False):
+        super().__init__(address, MockLLMHandler)
+        self.profile = profile
+        self.seed = seed
+        self.models = models
+        self.verbose = verbose
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def count(self, key):
+        with self._counts_lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def stats(self):
+        with self._counts_lock:
+            return dict(self._counts)
+
+def make_profile(name='instant', seed=0, **overrides):
+    """A MockProfile from a named preset, with any non-None overrides applied"""
+    settings = dict(PROFILES[name])
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return MockProfile(seed=seed, **settings)
+
+def start_mock_llm(host='127.0.0.1', port=0, profile='instant', seed=0, **overrides):
+    """Serve the mock from a background thread; port 0 picks a free port. Returns the server."""
+    server = MockLLMServer((host, port), make_profile(profile, seed, **overrides), seed=seed)
+    threading.Thread(target=server.serve_forever, name='mock-llm', daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='fast')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=None)
+    parser.add_argument('--latency-jitter-ms', type=float, default=None)
+    parser.add_argument('--latency-distribution', choices=['fixed', 'uniform', 'normal', 'lognormal'], default=None)
+    parser.add_argument('--tokens-per-second', type=float, default=None)
+    parser.add_argument('--error-rate', type=float, default=None)
+    parser.add_argument('--error-statuses', default=None, help='Comma-separated statuses to inject, e.g. 429,500,503')
+    parser.add_argument('--timeout-rate', type=float, default=None)
+    parser.add_argument('--hang-seconds', type=float, default=None, help='How long an injected timeout stalls')
+    parser.add_argument('--stream-abort-rate', type=float, default=None)
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args(argv)
+
+    profile = make_profile(
+        args.profile, args.seed,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        latency_distribution=args.latency_distribution,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_statuses=[int(s) for s in args.error_statuses.split(',')] if args.error_statuses else None,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        stream_abort_rate=args.stream_abort_rate,
+    )
+    server = MockLLMServer((args.host, args.port), profile, seed=args.seed, verbose=args.verbose)
+    print(f"Mock LLM ({args.profile} profile) at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
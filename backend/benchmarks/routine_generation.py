@@ -0,0 +1,101 @@
+"""
+Latency comparison of the routine generation modes.
+
+Runs POST /api/routines/generate-ai through the Flask test client in both
+'two_step' (routines call + summary call) and 'single' (one structured-output
+call) modes against the configured LLM, with the completion cache disabled.
+
+Usage (from backend/):
+    OPENAI_API_KEY=... OPENAI_BASE_URL=http://127.0.0.1:8000/v1 \
+        python -m benchmarks.routine_generation --iterations 10 --output results.json
+    python -m benchmarks.routine_generation --mock realistic --iterations 10
+
+--mock starts the in-repo stand-in (benchmarks.mock_llm) with the given profile
+and points the app at it, so the comparison runs offline and reproducibly.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import config
+from benchmarks.harness import (
+    BenchmarkConfig, login, summarize, write_results, compare_to_baseline, print_comparisons
+)
+from benchmarks.mock_llm import PROFILES, start_mock_llm
+
+MODES = ('two_step', 'single')
+
+def run_mode(mode, iterations, config_class=BenchmarkConfig):
+    """Time `iterations` generate-ai requests in one mode. Returns a result dict."""
+    config['routine_benchmark'] = config_class
+    app = create_app('routine_benchmark')
+    app.config['ROUTINE_GENERATION_MODE'] = mode
+    client = app.test_client()
+
+    timings = []
+    llm_calls_ok = 0
+    for i in range(iterations):
+        # Fresh user per iteration so every request creates its routines
+        headers = login(client, f'bench_{mode}_{i}')
+        started = time.perf_counter()
+        response = client.post('/api/routines/generate-ai', headers=headers, json={
+            'goals': f'get fit and read more (variant {i})',
+            'challenges': 'busy schedule, low motivation',
+            'unavailable_times': '9-5 PM',
+            'desired_routines': 'gym, reading, meditation',
+        })
+        timings.append((time.perf_counter() - started) * 1000)
+        body = response.get_json() or {}
+        if body.get('used_llm_generation') and body.get('used_llm_summary'):
+            llm_calls_ok += 1
+
+    return summarize(f'generate-ai ({mode})', timings, mode=mode, llm_success=llm_calls_ok)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--mock', choices=sorted(PROFILES), help='Serve the LLM from the local mock with this profile')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --output file')
+    parser.add_argument('--max-ratio', type=float, default=1.25,
+                        help='Flag results whose p50 exceeds this multiple of the baseline')
+    args = parser.parse_args(argv)
+
+    config_class, mock = BenchmarkConfig, None
+    if args.mock:
+        mock = start_mock_llm(profile=args.mock)
+
+        class MockLLMConfig(BenchmarkConfig):
+            OPENAI_API_KEY = 'mock'
+            LLM_BASE_URL = mock.base_url
+
+        config_class = MockLLMConfig
+    elif not os.getenv('OPENAI_API_KEY'):
+        parser.error('OPENAI_API_KEY must be set (or use --mock / point OPENAI_BASE_URL at a stand-in to run offline)')
+
+    try:
+        results = [run_mode(mode, args.iterations, config_class) for mode in MODES]
+    finally:
+        if mock:
+            mock.shutdown()
+    for r in results:
+        print(f"{r['mode']:>9}: mean {r['mean_ms']:.1f} ms, p50 {r['p50_ms']:.1f} ms, "
+              f"max {r['max_ms']:.1f} ms ({r['llm_success']}/{r['iterations']} fully LLM-generated)")
+    two_step, single = results
+    if single['p50_ms']:
+        print(f"single-call speedup (p50): {two_step['p50_ms'] / single['p50_ms']:.2f}x")
+
+    if args.output:
+        write_results(args.output, 'routine_generation', {'iterations': args.iterations, 'mock': args.mock}, results)
+
+    if args.baseline:
+        regressed = print_comparisons(compare_to_baseline(results, args.baseline, args.max_ratio), args.max_ratio)
+        if regressed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Per-user change sequence for delta sync.
+
+Every flush that adds or modifies a user's routines, daily logs, routine entries
+or feedback takes the next number from the user's sync_sequences row (locked
+for the rest of the transaction, so numbers become visible in commit order) and
+stamps it on the changed rows as change_seq; new rows also get it as
+created_seq. A client that remembers the highest number it has seen can then
+ask for just the rows with a greater change_seq.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import SyncSequence
+from etags import owner_and_collection
+import base64
+import json
+
+def _locked_rows(session):
+    """Sequence rows already locked by the current transaction, by user id"""
+    transaction = session.get_transaction()
+    locked = session.info.get('sync_seq_locked')
+    if locked is None or locked[0] is not transaction:
+        locked = (transaction, {})
+        session.info['sync_seq_locked'] = locked
+    return locked[1]
+
+def _create_sequence_row(session, user_id):
+    """
+    The user's first write: insert their row unless a concurrent first write
+    already did, then lock whichever row won.
+    """
+    from upserts import _dialect_insert
+    insert = _dialect_insert(session.get_bind().dialect.name)
+    if insert is None:
+        row = SyncSequence(user_id=user_id, last_seq=0)
+        session.add(row)
+        return row
+    session.execute(
+        insert(SyncSequence).values(user_id=user_id, last_seq=0).on_conflict_do_nothing(index_elements=['user_id'])
+    )
+    return session.get(SyncSequence, user_id, with_for_update=True)
+
+def next_change_seq(session, user_id):
+    """Allocate the user's next change sequence number, locking their sequence row"""
+    # Held here rather than re-read: the identity map only keeps clean rows weakly
+    locked = _locked_rows(session)
+    row = locked.get(user_id)
+    if row is None:
+        row = session.get(SyncSequence, user_id, with_for_update=True)
+        if row is None:
+            row = _create_sequence_row(session, user_id)
+        locked[user_id] = row
+    row.last_seq = (row.last_seq or 0) + 1
+    return row.last_seq
+
+def current_change_seq(session, user_id):
+    row = session.get(SyncSequence, user_id)
+    return row.last_seq if row else 0
+
+def _before_flush(session, flush_context, instances):
+    changed = {}
+    with session.no_autoflush:
+        for obj in session.new:
+            key = owner_and_collection(session, obj)
+            if key and key[0] is not None:
+                changed.setdefault(key[0], []).append((obj, True))
+        for obj in session.dirty:
+            if session.is_modified(obj, include_collections=False):
+                key = owner_and_collection(session, obj)
+                if key and key[0] is not None:
+                    changed.setdefault(key[0], []).append((obj, False))
+
+        # One number per user per flush is enough to order changes
+        for user_id, objs in changed.items():
+            seq = next_change_seq(session, user_id)
+            for obj, is_new in objs:
+                obj.change_seq = seq
+                if is_new:
+                    obj.created_seq = seq
+
+def init_changes(app):
+    """Register the sequence-stamping flush hook (called from create_app)"""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+
+def encode_sync_token(user_id, seq):
+    payload = json.dumps({'u': user_id, 's': seq})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_sync_token(token, user_id):
+    """
+    Return the sequence number a token was issued at, or None when it was
+    issued to another user. Raises ValueError if it is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        seq = int(payload['s'])
+        owner = int(payload['u'])
+    except Exception:
+        raise ValueError('Invalid sync token')
+    return seq if owner == user_id else None
@@ -12,9 +12,68 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 
+    # Authenticated-user cache (keyed by user id + profile version from the JWT)
+    AUTH_CACHE_ENABLED = os.getenv('AUTH_CACHE_ENABLED', 'true').lower() == 'true'
+    AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', '300'))  # seconds
+    AUTH_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '10000'))
+
+    # Password hashing (bounded pool; see passwords.py)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')  # werkzeug method string, e.g. 'pbkdf2:sha256:600000'
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))  # hashes computed concurrently
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', '5'))  # seconds to wait for a slot before 503
+
+    # Per-request SQL query accounting
+    QUERY_STATS_HEADERS = False  # Expose X-Query-Count / X-Query-Time-Ms headers
+    QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '20'))  # Log requests issuing more queries than this
+
+    # Keyset pagination for list endpoints
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '100'))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '500'))
+
+    # NDJSON export (rows fetched per server-side cursor batch and written per chunk)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+
+    # Bulk import of historical logs (records written per executemany batch / transaction)
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '100'))  # Errors listed in the summary
+
+    # Background feedback generation
+    FEEDBACK_JOB_WORKERS = int(os.getenv('FEEDBACK_JOB_WORKERS', '4'))
+    FEEDBACK_JOB_MAX_ATTEMPTS = int(os.getenv('FEEDBACK_JOB_MAX_ATTEMPTS', '3'))
+    FEEDBACK_JOB_RETRY_DELAY = float(os.getenv('FEEDBACK_JOB_RETRY_DELAY', '1.0'))  # seconds, doubles per attempt
+    FEEDBACK_JOB_STALE_AFTER = int(os.getenv('FEEDBACK_JOB_STALE_AFTER', '600'))  # seconds before a 'running' job is presumed dead
+    FEEDBACK_JOBS_INLINE = False  # Run jobs in the request thread instead of the worker pool
+
+    # Routine/wellbeing correlation reports (cached per user until their logs or routines change)
+    ANALYTICS_CACHE_ENABLED = os.getenv('ANALYTICS_CACHE_ENABLED', 'true').lower() == 'true'
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', '3600'))  # seconds
+    ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYTICS_CACHE_MAX_ENTRIES', '1000'))
+    FEEDBACK_CORRELATIONS = os.getenv('FEEDBACK_CORRELATIONS', 'true').lower() == 'true'  # Add them to feedback prompts
+
+    # LLM client (shared, pooled connections)
+    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    LLM_BASE_URL = os.getenv('OPENAI_BASE_URL')  # Point at an OpenAI-compatible stand-in for tests/benchmarks
+    LLM_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+    LLM_FEEDBACK_MODEL = os.getenv('OPENAI_FEEDBACK_MODEL', 'gpt-4')
+    LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))  # seconds per call, across retries
+    LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+    LLM_RETRY_BACKOFF = float(os.getenv('LLM_RETRY_BACKOFF', '0.5'))  # seconds, doubles per retry
+    LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '20'))
+    LLM_MAX_KEEPALIVE = int(os.getenv('LLM_MAX_KEEPALIVE', '10'))
+    # 'two_step': routines call then summary call; 'single': one structured-output call for both
+    ROUTINE_GENERATION_MODE = os.getenv('ROUTINE_GENERATION_MODE', 'two_step')
+
+    # LLM response cache (keyed on model + prompts + temperature)
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH')  # Defaults to instance/llm_cache.sqlite3
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', '86400'))  # seconds
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
+    QUERY_STATS_HEADERS = True
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -24,6 +83,10 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    QUERY_STATS_HEADERS = True
+    FEEDBACK_JOBS_INLINE = True
+    LLM_CACHE_PATH = ':memory:'
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Cheap hashes keep tests fast
 
 config = {
     'development': DevelopmentConfig,
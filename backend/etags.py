@@ -0,0 +1,142 @@
+"""
+Conditional GET support for per-user collections.
+
+Every flush that adds, changes or deletes a routine, daily log, routine entry or
+feedback row bumps the owning user's version counter for that collection. List
+and detail endpoints derive a strong ETag (and Last-Modified) from those
+counters, so a revalidation whose If-None-Match still matches is answered with
+304 after one indexed lookup of the counters, before any rows are loaded or serialized.
+"""
+from flask import request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import CollectionVersion, Routine, DailyLog, RoutineEntry, Feedback
+from datetime import date, datetime, timezone
+from functools import wraps
+import hashlib
+
+def owner_and_collection(session, obj):
+    """(user_id, collection) whose version a change to obj invalidates, or None"""
+    if isinstance(obj, Routine):
+        return obj.user_id, 'routines'
+    if isinstance(obj, DailyLog):
+        return obj.user_id, 'daily_logs'
+    if isinstance(obj, Feedback):
+        return obj.user_id, 'feedback'
+    if isinstance(obj, RoutineEntry):
+        log = obj.daily_log
+        if log is None and obj.daily_log_id is not None:
+            log = session.get(DailyLog, obj.daily_log_id)
+        return (log.user_id, 'daily_logs') if log is not None else None
+    return None
+
+def bump_collection_versions(session, changes):
+    """
+    Increment the version row for each (user_id, collection) pair in changes.
+    Rows are created or incremented with one INSERT ... ON CONFLICT DO UPDATE, so
+    two concurrent first writes to a collection cannot both insert its row.
+    """
+    from upserts import _dialect_insert
+    now = datetime.utcnow()
+    insert = _dialect_insert(session.get_bind().dialect.name)
+    if insert is not None:
+        for user_id, collection in changes:
+            session.execute(
+                insert(CollectionVersion).values(
+                    user_id=user_id, collection=collection, version=1, updated_at=now
+                ).on_conflict_do_update(
+                    index_elements=['user_id', 'collection'],
+                    set_={'version': CollectionVersion.version + 1, 'updated_at': now}
+                )
+            )
+            # A copy loaded earlier in this session would otherwise keep the old version
+            row = session.identity_map.get(session.identity_key(CollectionVersion, (user_id, collection)))
+            if row is not None:
+                session.expire(row)
+        return
+    for user_id, collection in changes:
+        row = session.get(CollectionVersion, (user_id, collection))
+        if row is None:
+            session.add(CollectionVersion(user_id=user_id, collection=collection, version=1, updated_at=now))
+        else:
+            row.version = CollectionVersion.version + 1
+            row.updated_at = now
+
+def _before_flush(session, flush_context, instances):
+    changes = set()
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.deleted):
+            key = owner_and_collection(session, obj)
+            if key:
+                changes.add(key)
+        for obj in session.dirty:
+            if session.is_modified(obj, include_collections=False):
+                key = owner_and_collection(session, obj)
+                if key:
+                    changes.add(key)
+        bump_collection_versions(session, {c for c in changes if c[0] is not None})
+
+def init_etags(app):
+    """Register the version-bumping flush hook (called from create_app)"""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+
+def collection_etag(user_id, collections):
+    """
+    Compute the validators for the current request over the given collections.
+
+    Returns:
+        (etag, last_modified) - last_modified is None until the user has written anything
+    """
+    rows = CollectionVersion.query.filter(
+        CollectionVersion.user_id == user_id,
+        CollectionVersion.collection.in_(collections)
+    ).all()
+    versions = {row.collection: row.version for row in rows}
+    stamps = [row.updated_at for row in rows if row.updated_at]
+
+    # The path and query string are part of the tag: each page/filter is its own representation.
+    # So is the date, since derived fields such as current streaks change at midnight.
+    fingerprint = '|'.join(
+        [str(user_id), date.today().isoformat(), request.path, request.query_string.decode('utf-8', 'replace')] +
+        [f"{name}={versions.get(name, 0)}" for name in sorted(collections)]
+    )
+    etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+    last_modified = max(stamps).replace(tzinfo=timezone.utc) if stamps else None
+    return etag, last_modified
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional_get(*collections):
+    """
+    Decorator for GET endpoints whose response depends only on the caller's rows
+    in the given collections. Must be applied below token_required /
+    token_claims_required so it receives current_user.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            etag, last_modified = collection_etag(current_user.id, collections)
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(current_user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            # Clients may store the body but must revalidate before reusing it
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            return response
+
+        return decorated
+    return decorator
@@ -0,0 +1,121 @@
+"""
+Background job runner for feedback generation.
+
+Jobs are persisted in the feedback_jobs table and executed by a bounded
+in-process thread pool, so the request that enqueues a job returns immediately.
+Each job runs in its own app context (and therefore its own DB session) and is
+retried with exponential backoff before being marked as failed. A job left
+'running' by a worker that died is stale once its current attempt is older
+than FEEDBACK_JOB_STALE_AFTER seconds, and is requeued rather than reused.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import random
+import time
+from flask import current_app
+from models import db, FeedbackJob
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+def stale_cutoff():
+    """Attempts started before this time belong to a dead worker"""
+    return datetime.utcnow() - timedelta(seconds=current_app.config.get('FEEDBACK_JOB_STALE_AFTER', 600))
+
+def is_stale(job):
+    return job.status == 'running' and (job.started_at is None or job.started_at < stale_cutoff())
+
+def requeue_stale_jobs():
+    """Put 'running' jobs abandoned by a dead worker back in the queue. Returns jobs requeued."""
+    requeued = FeedbackJob.query.filter(
+        FeedbackJob.status == 'running',
+        db.or_(FeedbackJob.started_at.is_(None), FeedbackJob.started_at < stale_cutoff())
+    ).update({FeedbackJob.status: 'queued'}, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+def init_job_queue(app):
+    """Create the worker pool for this app (called from create_app)"""
+    executor = None
+    if not app.config.get('FEEDBACK_JOBS_INLINE'):
+        executor = ThreadPoolExecutor(
+            max_workers=app.config.get('FEEDBACK_JOB_WORKERS', 4),
+            thread_name_prefix='feedback-job'
+        )
+    app.extensions['feedback_jobs'] = executor
+
+def enqueue_job(app, job_id, handler):
+    """
+    Schedule a committed job for execution.
+
+    Args:
+        app: Flask app whose context the worker should run in
+        job_id: Id of a committed FeedbackJob row
+        handler: Callable taking the FeedbackJob and returning the Feedback it persisted
+    """
+    executor = app.extensions.get('feedback_jobs')
+    if executor is None:
+        run_job(app, job_id, handler)
+    else:
+        executor.submit(run_job, app, job_id, handler)
+
+def run_job(app, job_id, handler):
+    """Execute a job with retries, recording its status as it progresses"""
+    max_attempts = app.config.get('FEEDBACK_JOB_MAX_ATTEMPTS', 3)
+    retry_delay = app.config.get('FEEDBACK_JOB_RETRY_DELAY', 1.0)
+
+    with app.app_context():
+        job = db.session.get(FeedbackJob, job_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return
+
+        while True:
+            job.status = 'running'
+            job.attempts = (job.attempts or 0) + 1
+            job.started_at = datetime.utcnow()  # Start of the current attempt, for stale detection
+            db.session.commit()
+
+            try:
+                feedback = handler(job)
+                db.session.flush()
+                job.feedback_id = feedback.id
+                job.status = 'succeeded'
+                job.error = None
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                return
+            except Exception as e:
+                db.session.rollback()
+                app.logger.warning(f"Feedback job {job_id} attempt {job.attempts} failed: {e}")
+                job.error = str(e)[:1000]
+                if job.attempts >= max_attempts:
+                    job.status = 'failed'
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+                    return
+                job.status = 'queued'
+                db.session.commit()
+
+            # Exponential backoff with jitter between attempts
+            delay = retry_delay * (2 ** (job.attempts - 1))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+def drain_queued_jobs(app, handler):
+    """Run every queued or stale job synchronously (used by the CLI worker). Returns jobs processed."""
+    requeue_stale_jobs()
+    job_ids = [job_id for (job_id,) in db.session.query(FeedbackJob.id).filter_by(status='queued').order_by(FeedbackJob.id)]
+    for job_id in job_ids:
+        run_job(app, job_id, handler)
+    return len(job_ids)
+
+def serialize_job(job):
+    """Public representation of a job for API responses"""
+    return {
+        'id': job.id,
+        'daily_log_id': job.daily_log_id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.error,
+        'feedback_id': job.feedback_id,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
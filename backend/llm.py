@@ -0,0 +1,169 @@
+"""
+Application-scoped LLM client.
+
+A single OpenAI client is created in create_app and shared by every request,
+so calls reuse pooled keep-alive connections instead of paying a fresh TLS
+handshake. Calls get a deadline, bounded retries with jittered exponential
+backoff, and go through the completion cache. LLM_BASE_URL (OPENAI_BASE_URL)
+can point the client at any OpenAI-compatible stand-in for tests and benchmarks.
+"""
+from flask import current_app
+from llm_cache import LLMCache, cached_completion
+import random
+import time
+
+try:
+    import httpx
+    import openai
+    from openai import OpenAI
+except Exception:
+    httpx = None
+    openai = None
+    OpenAI = None
+
+class LLMUnavailable(Exception):
+    """Raised when no LLM client is configured"""
+
+def _retryable_errors():
+    if openai is None:
+        return ()
+    return (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+def init_llm(app):
+    """Create the shared LLM client for this app (called from create_app)"""
+    api_key = app.config.get('OPENAI_API_KEY')
+    if OpenAI is None or not api_key or api_key == 'your-api-key-here':
+        app.extensions['llm'] = None
+        return
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=app.config.get('LLM_MAX_CONNECTIONS', 20),
+            max_keepalive_connections=app.config.get('LLM_MAX_KEEPALIVE', 10),
+            keepalive_expiry=app.config.get('LLM_KEEPALIVE_EXPIRY', 60),
+        ),
+        timeout=httpx.Timeout(
+            app.config.get('LLM_TIMEOUT', 30),
+            connect=app.config.get('LLM_CONNECT_TIMEOUT', 5),
+        ),
+    )
+    # Retries are handled here so they respect the per-call deadline
+    app.extensions['llm'] = OpenAI(
+        api_key=api_key,
+        base_url=app.config.get('LLM_BASE_URL') or None,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+def get_llm_client():
+    """Return the app's shared client, or None when the LLM is not configured"""
+    return current_app.extensions.get('llm')
+
+def llm_available():
+    return get_llm_client() is not None
+
+def call_with_retries(fn, timeout=None):
+    """
+    Call fn(remaining_seconds) until it succeeds, retrying transient API errors.
+
+    Retries stop after LLM_MAX_RETRIES or when the backoff would overrun the
+    overall deadline; the last error is re-raised.
+    """
+    config = current_app.config
+    deadline = time.monotonic() + (timeout or config.get('LLM_TIMEOUT', 30))
+    max_retries = config.get('LLM_MAX_RETRIES', 2)
+    backoff = config.get('LLM_RETRY_BACKOFF', 0.5)
+
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            return fn(max(remaining, 0.1))
+        except _retryable_errors():
+            # Full jitter: sleep a random fraction of the exponential step
+            delay = random.uniform(0, backoff * (2 ** attempt))
+            if attempt >= max_retries or time.monotonic() + delay >= deadline:
+                raise
+            attempt += 1
+            time.sleep(delay)
+
+def chat_completion(system_prompt, user_prompt, temperature, model=None, timeout=None, **params):
+    """
+    Return the text of a chat completion, served from the cache when possible.
+
+    Args:
+        system_prompt, user_prompt: Message contents
+        temperature: Sampling temperature
+        model: Defaults to LLM_MODEL
+        timeout: Overall deadline in seconds across retries (defaults to LLM_TIMEOUT)
+        **params: Extra create() arguments (max_tokens, response_format, ...)
+    """
+    client = get_llm_client()
+    if client is None:
+        raise LLMUnavailable('LLM client is not configured')
+    model = model or current_app.config.get('LLM_MODEL')
+
+    def fetch():
+        completion = call_with_retries(lambda remaining: client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=temperature,
+            timeout=remaining,
+            **params
+        ), timeout=timeout)
+        return completion.choices[0].message.content if completion.choices else None
+
+    return cached_completion(model, system_prompt, user_prompt, temperature, fetch, **params)
+
+def stream_chat_completion(system_prompt, user_prompt, temperature, model=None, timeout=None, **params):
+    """
+    Yield the text of a chat completion as it arrives.
+
+    Only opening the stream is retried; once tokens have been yielded an error
+    propagates to the caller. A cached completion is yielded as one chunk, and a
+    fully streamed completion is stored in the cache under the same key as
+    chat_completion() would use.
+    """
+    client = get_llm_client()
+    if client is None:
+        raise LLMUnavailable('LLM client is not configured')
+    model = model or current_app.config.get('LLM_MODEL')
+
+    cache = current_app.extensions.get('llm_cache')
+    key = LLMCache.make_key(model, system_prompt, user_prompt, temperature, **params)
+    if cache is not None:
+        content = cache.get(key)
+        if content is not None:
+            yield content
+            return
+
+    stream = call_with_retries(lambda remaining: client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=temperature,
+        stream=True,
+        timeout=remaining,
+        **params
+    ), timeout=timeout)
+
+    parts = []
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    content = ''.join(parts)
+    if cache is not None and content:
+        cache.set(key, content)
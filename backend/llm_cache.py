@@ -0,0 +1,145 @@
+"""
+Content-addressed cache for LLM chat completions.
+
+Prompts built by prompts.build_* are deterministic, so identical requests
+(retries, regenerate taps, duplicate submissions) can be answered from a local
+SQLite store instead of paying another LLM round trip. Entries expire after a
+TTL and the least recently used entries are evicted beyond a size bound.
+"""
+from flask import current_app
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class LLMCache:
+    """SQLite-backed completion cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, path, ttl_seconds=86400, max_entries=1000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, system_prompt, user_prompt, temperature, **params):
+        """Hash of everything that determines the completion"""
+        payload = json.dumps({
+            'model': model,
+            'system': system_prompt,
+            'user': user_prompt,
+            'temperature': temperature,
+            'params': params,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached completion, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self._misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        """Store a completion, evicting least recently used entries past max_entries"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._evictions += overflow
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current entry count"""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else None,
+                'evictions': self._evictions,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+def init_llm_cache(app):
+    """Create the app's LLM cache (called from create_app)"""
+    cache = None
+    if app.config.get('LLM_CACHE_ENABLED'):
+        path = app.config.get('LLM_CACHE_PATH')
+        if not path:
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, 'llm_cache.sqlite3')
+        cache = LLMCache(
+            path,
+            ttl_seconds=app.config.get('LLM_CACHE_TTL', 86400),
+            max_entries=app.config.get('LLM_CACHE_MAX_ENTRIES', 1000)
+        )
+    app.extensions['llm_cache'] = cache
+
+def cached_completion(model, system_prompt, user_prompt, temperature, fetch, **params):
+    """
+    Return the completion text for a prompt, calling fetch() only on a cache miss.
+
+    Args:
+        model, system_prompt, user_prompt, temperature, **params: Cache key inputs
+        fetch: Zero-argument callable performing the LLM call and returning text
+    """
+    cache = current_app.extensions.get('llm_cache')
+    if cache is None:
+        return fetch()
+
+    key = LLMCache.make_key(model, system_prompt, user_prompt, temperature, **params)
+    content = cache.get(key)
+    if content is not None:
+        return content
+
+    content = fetch()
+    if content:
+        cache.set(key, content)
+    return content
@@ -0,0 +1,68 @@
+"""add unique (user_id, log_date) constraint to daily_logs
+
+Revision ID: add_daily_log_unique_constraint
+Revises: add_feedback_jobs
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_daily_log_unique_constraint'
+down_revision = 'add_feedback_jobs'
+branch_labels = None
+depends_on = None
+
+# Oldest log of each (user, day) survives; later duplicates are folded into it
+DUPLICATE_LOGS = (
+    "SELECT d.id FROM daily_logs d WHERE d.id <> ("
+    "SELECT MIN(k.id) FROM daily_logs k WHERE k.user_id = d.user_id AND k.log_date = d.log_date)"
+)
+
+# Users with more than one log on some day
+AFFECTED_USERS = "SELECT user_id FROM daily_logs GROUP BY user_id, log_date HAVING COUNT(*) > 1"
+
+
+def kept_log(entries):
+    """SQL for the id of the log that will keep the entries row aliased as `entries`"""
+    return (
+        "(SELECT MIN(k.id) FROM daily_logs k, daily_logs d "
+        f"WHERE d.id = {entries}.daily_log_id AND k.user_id = d.user_id AND k.log_date = d.log_date)"
+    )
+
+
+def upgrade():
+    # Their aggregates counted the duplicate logs and entries; without a user_stats
+    # row they are rebuilt from the deduplicated history on next use
+    op.execute(f"DELETE FROM routine_stats WHERE user_id IN ({AFFECTED_USERS})")
+    op.execute(f"DELETE FROM user_stats WHERE user_id IN ({AFFECTED_USERS})")
+
+    # Move entries of duplicate logs to the kept log, dropping those whose routine
+    # is already logged there or on an earlier entry of another duplicate
+    op.execute(
+        f"DELETE FROM routine_entries WHERE daily_log_id IN ({DUPLICATE_LOGS}) "
+        "AND EXISTS (SELECT 1 FROM routine_entries e "
+        f"WHERE e.routine_id = routine_entries.routine_id AND e.id <> routine_entries.id "
+        f"AND {kept_log('e')} = {kept_log('routine_entries')} "
+        f"AND (e.daily_log_id = {kept_log('routine_entries')} OR e.id < routine_entries.id))"
+    )
+    op.execute(
+        f"UPDATE routine_entries SET daily_log_id = {kept_log('routine_entries')} "
+        f"WHERE daily_log_id IN ({DUPLICATE_LOGS})"
+    )
+    # Feedback (and its jobs) described the duplicate day only; it can be regenerated
+    op.execute(f"DELETE FROM feedback_jobs WHERE daily_log_id IN ({DUPLICATE_LOGS})")
+    op.execute(f"DELETE FROM feedback WHERE daily_log_id IN ({DUPLICATE_LOGS})")
+    op.execute(f"DELETE FROM daily_logs WHERE id IN (SELECT id FROM ({DUPLICATE_LOGS}) AS dup)")
+
+    # The constraint's index covers (user_id, log_date), replacing the pagination index
+    op.drop_index('ix_daily_logs_user_id_log_date', table_name='daily_logs')
+    with op.batch_alter_table('daily_logs', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_daily_logs_user_id_log_date', ['user_id', 'log_date'])
+
+
+def downgrade():
+    with op.batch_alter_table('daily_logs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_daily_logs_user_id_log_date', type_='unique')
+    op.create_index('ix_daily_logs_user_id_log_date', 'daily_logs', ['user_id', 'log_date'])
@@ -0,0 +1,57 @@
+"""add weekday bitmask days_mask to routines
+
+Revision ID: add_days_mask
+Revises: add_daily_log_unique_constraint
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_days_mask'
+down_revision = 'add_daily_log_unique_constraint'
+branch_labels = None
+depends_on = None
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+def days_to_mask(selected_days):
+    # Frozen copy of models.days_to_mask
+    if selected_days is None or selected_days.strip().lower() == 'all':
+        return 0b1111111
+    mask = 0
+    for day in selected_days.split(','):
+        day = day.strip()[:3].capitalize()
+        if day in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(day)
+    return mask
+
+
+def upgrade():
+    with op.batch_alter_table('routines', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('days_mask', sa.Integer(), nullable=False, server_default='127'))
+
+    # Backfill from the strings; only routines not scheduled every day need an update
+    conn = op.get_bind()
+    routines = sa.table('routines', sa.column('id', sa.Integer), sa.column('selected_days', sa.String), sa.column('days_mask', sa.Integer))
+    updates = [
+        {'routine_id': routine_id, 'mask': days_to_mask(selected_days)}
+        for routine_id, selected_days in conn.execute(sa.select(routines.c.id, routines.c.selected_days))
+        if days_to_mask(selected_days) != 0b1111111
+    ]
+    if updates:
+        conn.execute(
+            routines.update().where(routines.c.id == sa.bindparam('routine_id')).values(days_mask=sa.bindparam('mask')),
+            updates
+        )
+
+    op.create_index('ix_routines_user_id_is_active_days_mask', 'routines', ['user_id', 'is_active', 'days_mask'])
+
+
+def downgrade():
+    op.drop_index('ix_routines_user_id_is_active_days_mask', table_name='routines')
+    with op.batch_alter_table('routines', schema=None) as batch_op:
+        batch_op.drop_column('days_mask')
@@ -0,0 +1,40 @@
+"""add feedback_jobs table for background feedback generation
+
+Revision ID: add_feedback_jobs
+Revises: add_sync_change_seq
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_feedback_jobs'
+down_revision = 'add_sync_change_seq'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'feedback_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('daily_log_id', sa.Integer(), sa.ForeignKey('daily_logs.id'), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('feedback_id', sa.Integer(), sa.ForeignKey('feedback.id'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_feedback_jobs_user_id', 'feedback_jobs', ['user_id'])
+    op.create_index('ix_feedback_jobs_daily_log_id', 'feedback_jobs', ['daily_log_id'])
+
+
+def downgrade():
+    op.drop_index('ix_feedback_jobs_daily_log_id', table_name='feedback_jobs')
+    op.drop_index('ix_feedback_jobs_user_id', table_name='feedback_jobs')
+    op.drop_table('feedback_jobs')
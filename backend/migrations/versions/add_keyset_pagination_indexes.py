@@ -0,0 +1,28 @@
+"""add composite indexes for keyset pagination
+
+Revision ID: add_pagination_indexes
+Revises: add_routine_stats
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pagination_indexes'
+down_revision = 'add_routine_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # List endpoints page through (user_id, sort key, id)
+    op.create_index('ix_daily_logs_user_id_log_date', 'daily_logs', ['user_id', 'log_date'])
+    op.create_index('ix_feedback_user_id_created_at', 'feedback', ['user_id', 'created_at'])
+    op.create_index('ix_routines_user_id_created_at', 'routines', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_routines_user_id_created_at', table_name='routines')
+    op.drop_index('ix_feedback_user_id_created_at', table_name='feedback')
+    op.drop_index('ix_daily_logs_user_id_log_date', table_name='daily_logs')
@@ -0,0 +1,27 @@
+"""add profile_version to users
+
+Revision ID: add_profile_version
+Revises: add_pagination_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_profile_version'
+down_revision = 'add_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Embedded in JWTs to key the authenticated-user cache
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('profile_version')
@@ -0,0 +1,43 @@
+"""add unique (daily_log_id, routine_id) constraint to routine_entries
+
+Revision ID: add_entry_unique_constraint
+Revises: add_collection_versions
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_entry_unique_constraint'
+down_revision = 'add_collection_versions'
+branch_labels = None
+depends_on = None
+
+
+# Owners of logs holding more than one entry for the same routine
+AFFECTED_USERS = (
+    "SELECT d.user_id FROM routine_entries e JOIN daily_logs d ON d.id = e.daily_log_id "
+    "GROUP BY e.daily_log_id, e.routine_id, d.user_id HAVING COUNT(*) > 1"
+)
+
+
+def upgrade():
+    # Their aggregates counted the duplicates; without a user_stats row they are
+    # rebuilt from the deduplicated history on next use
+    op.execute(f"DELETE FROM routine_stats WHERE user_id IN ({AFFECTED_USERS})")
+    op.execute(f"DELETE FROM user_stats WHERE user_id IN ({AFFECTED_USERS})")
+
+    # Keep the oldest entry of any duplicates created before the constraint existed
+    op.execute(
+        "DELETE FROM routine_entries WHERE id NOT IN ("
+        "SELECT min_id FROM (SELECT MIN(id) AS min_id FROM routine_entries "
+        "GROUP BY daily_log_id, routine_id) AS keep)"
+    )
+    with op.batch_alter_table('routine_entries', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_routine_entries_daily_log_id_routine_id', ['daily_log_id', 'routine_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('routine_entries', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_routine_entries_daily_log_id_routine_id', type_='unique')
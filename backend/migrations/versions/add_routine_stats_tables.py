@@ -0,0 +1,50 @@
+"""add routine_stats and user_stats aggregate tables
+
+Revision ID: add_routine_stats
+Revises: add_selected_days
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_routine_stats'
+down_revision = 'add_selected_days'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-routine completion counters
+    op.create_table(
+        'routine_stats',
+        sa.Column('routine_id', sa.Integer(), sa.ForeignKey('routines.id'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('total_attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_routine_stats_user_id', 'routine_stats', ['user_id'])
+
+    # Per-user mood/energy/stress running sums
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('days_logged', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('mood_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('mood_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energy_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energy_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('stress_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('stress_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    # Rows are backfilled lazily on first use, or eagerly with `flask feedback rebuild-stats`
+
+
+def downgrade():
+    op.drop_table('user_stats')
+    op.drop_index('ix_routine_stats_user_id', table_name='routine_stats')
+    op.drop_table('routine_stats')
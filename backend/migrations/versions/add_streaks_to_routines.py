@@ -0,0 +1,31 @@
+"""add streak columns to routines
+
+Revision ID: add_routine_streaks
+Revises: add_days_mask
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_routine_streaks'
+down_revision = 'add_days_mask'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populate existing rows afterwards with `flask routines backfill-streaks`
+    with op.batch_alter_table('routines', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('last_completed_date', sa.Date(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('routines', schema=None) as batch_op:
+        batch_op.drop_column('last_completed_date')
+        batch_op.drop_column('longest_streak')
+        batch_op.drop_column('current_streak')
@@ -0,0 +1,59 @@
+"""add updated_at and change sequence columns for delta sync
+
+Revision ID: add_sync_change_seq
+Revises: add_entry_unique_constraint
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sync_change_seq'
+down_revision = 'add_entry_unique_constraint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_sequences',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Existing rows start at sequence 0, so they are only part of a full sync
+    for table in ('routines', 'routine_entries', 'feedback'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+    for table in ('routines', 'daily_logs', 'routine_entries', 'feedback'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+            batch_op.add_column(sa.Column('created_seq', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_index('ix_routines_user_id_change_seq', 'routines', ['user_id', 'change_seq'])
+    op.create_index('ix_daily_logs_user_id_change_seq', 'daily_logs', ['user_id', 'change_seq'])
+    op.create_index('ix_feedback_user_id_change_seq', 'feedback', ['user_id', 'change_seq'])
+    op.create_index(op.f('ix_routine_entries_change_seq'), 'routine_entries', ['change_seq'])
+
+
+def downgrade():
+    op.drop_index(op.f('ix_routine_entries_change_seq'), table_name='routine_entries')
+    op.drop_index('ix_feedback_user_id_change_seq', table_name='feedback')
+    op.drop_index('ix_daily_logs_user_id_change_seq', table_name='daily_logs')
+    op.drop_index('ix_routines_user_id_change_seq', table_name='routines')
+
+    for table in ('routines', 'daily_logs', 'routine_entries', 'feedback'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('created_seq')
+            batch_op.drop_column('change_seq')
+
+    for table in ('routines', 'routine_entries', 'feedback'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
+
+    op.drop_table('sync_sequences')
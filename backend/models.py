@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -17,6 +18,7 @@ class User(db.Model):
     last_name = db.Column(db.String(50))
     bio = db.Column(db.Text)
     goals = db.Column(db.Text)  # User's life goals
+    profile_version = db.Column(db.Integer, nullable=False, default=1)  # Bumped on profile updates; embedded in JWTs
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -25,10 +27,35 @@ class User(db.Model):
     routines = db.relationship('Routine', back_populates='user', cascade='all, delete-orphan')
     daily_logs = db.relationship('DailyLog', back_populates='user', cascade='all, delete-orphan')
     feedback_history = db.relationship('Feedback', back_populates='user', cascade='all, delete-orphan')
+    stats = db.relationship('UserStats', back_populates='user', uselist=False, cascade='all, delete-orphan')
+
+# Weekday bitmask for Routine.days_mask: Mon is bit 0 ... Sun is bit 6 (date.weekday() order)
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+ALL_DAYS_MASK = 0b1111111
+
+def days_to_mask(selected_days):
+    """Convert a selected_days string ('Mon,Wed,Fri' or 'all') to a weekday bitmask"""
+    if selected_days is None or selected_days.strip().lower() == 'all':
+        return ALL_DAYS_MASK
+    mask = 0
+    for day in selected_days.split(','):
+        day = day.strip()[:3].capitalize()
+        if day in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(day)
+    return mask
+
+def weekday_bit(day):
+    """Bit of a date's weekday in a days_mask"""
+    return 1 << day.weekday()
 
 class Routine(db.Model):
     """Daily routine templates created for user"""
     __tablename__ = 'routines'
+    __table_args__ = (
+        db.Index('ix_routines_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_routines_user_id_change_seq', 'user_id', 'change_seq'),
+        db.Index('ix_routines_user_id_is_active_days_mask', 'user_id', 'is_active', 'days_mask'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
@@ -39,21 +66,43 @@ class Routine(db.Model):
     # Expected frequency and target
     frequency = db.Column(db.String(50))  # 'daily', 'weekly', '3x per week', etc.
     selected_days = db.Column(db.String(100))  # Comma-separated days: 'Mon,Wed,Fri' or 'all' for daily
+    days_mask = db.Column(db.Integer, nullable=False, default=ALL_DAYS_MASK)  # selected_days as a weekday bitmask, kept in sync
     target_duration = db.Column(db.Integer)  # minutes
 
     # Priority
     priority = db.Column(db.Integer, default=5)  # 1-10 scale
     
     is_active = db.Column(db.Boolean, default=True)
+    
+    # Completion streaks, maintained on entry writes (see streaks.py)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # run ending at last_completed_date
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_completed_date = db.Column(db.Date)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Per-user change sequence numbers for delta sync (see changes.py)
+    change_seq = db.Column(db.Integer, nullable=False, default=0)
+    created_seq = db.Column(db.Integer, nullable=False, default=0)
     
     # Relationships
     user = db.relationship('User', back_populates='routines')
     daily_entries = db.relationship('RoutineEntry', back_populates='routine', cascade='all, delete-orphan')
+    stats = db.relationship('RoutineStats', back_populates='routine', uselist=False, cascade='all, delete-orphan')
+    
+    @validates('selected_days')
+    def _sync_days_mask(self, key, value):
+        self.days_mask = days_to_mask(value)
+        return value
 
 class DailyLog(db.Model):
     """Daily log entry from user"""
     __tablename__ = 'daily_logs'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'log_date', name='uq_daily_logs_user_id_log_date'),  # one log per day; backs the upsert
+        db.Index('ix_daily_logs_user_id_change_seq', 'user_id', 'change_seq'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
@@ -72,6 +121,10 @@ class DailyLog(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Per-user change sequence numbers for delta sync (see changes.py)
+    change_seq = db.Column(db.Integer, nullable=False, default=0)
+    created_seq = db.Column(db.Integer, nullable=False, default=0)
+    
     # Relationships
     user = db.relationship('User', back_populates='daily_logs')
     routine_entries = db.relationship('RoutineEntry', back_populates='daily_log', cascade='all, delete-orphan')
@@ -80,6 +133,10 @@ class DailyLog(db.Model):
 class RoutineEntry(db.Model):
     """User's performance on a specific routine for a specific day"""
     __tablename__ = 'routine_entries'
+    __table_args__ = (
+        # One entry per routine per day; bulk upserts rely on it
+        db.UniqueConstraint('daily_log_id', 'routine_id', name='uq_routine_entries_daily_log_id_routine_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     routine_id = db.Column(db.Integer, db.ForeignKey('routines.id'), nullable=False, index=True)
@@ -95,6 +152,11 @@ class RoutineEntry(db.Model):
     difficulty_felt = db.Column(db.Integer)  # 1-10 how difficult it was
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Change sequence numbers of the owning user (see changes.py)
+    change_seq = db.Column(db.Integer, nullable=False, default=0, index=True)
+    created_seq = db.Column(db.Integer, nullable=False, default=0)
     
     # Relationships
     routine = db.relationship('Routine', back_populates='daily_entries')
@@ -103,6 +165,10 @@ class RoutineEntry(db.Model):
 class Feedback(db.Model):
     """AI-generated feedback for a daily log"""
     __tablename__ = 'feedback'
+    __table_args__ = (
+        db.Index('ix_feedback_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_feedback_user_id_change_seq', 'user_id', 'change_seq'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
@@ -122,11 +188,98 @@ class Feedback(db.Model):
     
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Per-user change sequence numbers for delta sync (see changes.py)
+    change_seq = db.Column(db.Integer, nullable=False, default=0)
+    created_seq = db.Column(db.Integer, nullable=False, default=0)
     
     # Relationships
     user = db.relationship('User', back_populates='feedback_history')
     daily_log = db.relationship('DailyLog', back_populates='feedback')
 
+# Entry count per log as a deferred correlated subquery; list endpoints undefer it
+# to get the count in the same SELECT instead of loading each log's entries
+DailyLog.routine_entries_count = db.column_property(
+    db.select(db.func.count(RoutineEntry.id))
+    .where(RoutineEntry.daily_log_id == DailyLog.id)
+    .correlate_except(RoutineEntry)
+    .scalar_subquery(),
+    deferred=True
+)
+
+class FeedbackJob(db.Model):
+    """Background feedback generation request for a daily log"""
+    __tablename__ = 'feedback_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    daily_log_id = db.Column(db.Integer, db.ForeignKey('daily_logs.id'), nullable=False, index=True)
+    
+    # Lifecycle
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'succeeded', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)  # Last error message
+    feedback_id = db.Column(db.Integer, db.ForeignKey('feedback.id'))  # Set once succeeded
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    # Relationships
+    feedback = db.relationship('Feedback')
+
+class RoutineStats(db.Model):
+    """Running completion counters for a routine, updated on every entry write"""
+    __tablename__ = 'routine_stats'
+    
+    routine_id = db.Column(db.Integer, db.ForeignKey('routines.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    total_attempts = db.Column(db.Integer, nullable=False, default=0)  # number of entries logged
+    completed = db.Column(db.Integer, nullable=False, default=0)  # entries with status 'completed'
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    routine = db.relationship('Routine', back_populates='stats')
+
+class UserStats(db.Model):
+    """Running mood/energy/stress sums across all of a user's daily logs"""
+    __tablename__ = 'user_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    days_logged = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Sums and counts only include logged (non-empty) values
+    mood_sum = db.Column(db.Integer, nullable=False, default=0)
+    mood_count = db.Column(db.Integer, nullable=False, default=0)
+    energy_sum = db.Column(db.Integer, nullable=False, default=0)
+    energy_count = db.Column(db.Integer, nullable=False, default=0)
+    stress_sum = db.Column(db.Integer, nullable=False, default=0)
+    stress_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    user = db.relationship('User', back_populates='stats')
+
+class CollectionVersion(db.Model):
+    """Per-user version counter for a collection, bumped whenever any of its rows change"""
+    __tablename__ = 'collection_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    collection = db.Column(db.String(50), primary_key=True)  # 'routines', 'daily_logs', 'feedback'
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class SyncSequence(db.Model):
+    """Last change sequence number handed out for a user's synced rows"""
+    __tablename__ = 'sync_sequences'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+
 class Notification(db.Model):
     """Notifications for user"""
     __tablename__ = 'notifications'
@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are addressed by the (sort value, id) of the last row returned rather than
+by an offset, so fetching any page is a bounded index range scan no matter how
+much history precedes it. Cursors are opaque to clients.
+"""
+from flask import current_app, request
+from sqlalchemy import and_, or_
+from datetime import date, datetime, timedelta
+import base64
+import json
+
+def encode_cursor(sort_value, row_id):
+    payload = json.dumps([sort_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, python_type):
+    """Decode a cursor into (sort value, id). Raises ValueError if it is malformed."""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return python_type.fromisoformat(sort_value), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def parse_date_arg(name):
+    """Parse an optional YYYY-MM-DD query argument. Raises ValueError with a client-facing message."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name} date (use YYYY-MM-DD)')
+
+def parse_page_args():
+    """
+    Read limit/cursor/from/to from the query string.
+
+    Returns:
+        Dict with 'limit', 'cursor' (raw string or None), 'from' and 'to' (dates or None)
+    Raises:
+        ValueError with a client-facing message
+    """
+    default_limit = current_app.config.get('PAGE_SIZE_DEFAULT', 100)
+    max_limit = current_app.config.get('PAGE_SIZE_MAX', 500)
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+
+    return {
+        'limit': min(limit, max_limit),
+        'cursor': request.args.get('cursor') or None,
+        'from': parse_date_arg('from'),
+        'to': parse_date_arg('to'),
+    }
+
+def filter_date_range(query, column, date_from, date_to):
+    """Restrict a query to an inclusive date range on a Date or DateTime column"""
+    if column.type.python_type is datetime:
+        if date_from:
+            query = query.filter(column >= datetime.combine(date_from, datetime.min.time()))
+        if date_to:
+            query = query.filter(column < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    else:
+        if date_from:
+            query = query.filter(column >= date_from)
+        if date_to:
+            query = query.filter(column <= date_to)
+    return query
+
+def keyset_page(query, sort_column, id_column, limit, cursor=None, descending=True):
+    """
+    Fetch one page of a query ordered by (sort_column, id_column).
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+    Raises:
+        ValueError if the cursor is malformed
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column.type.python_type)
+        if descending:
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            ))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
@@ -0,0 +1,106 @@
+"""
+Bounded, off-thread password hashing.
+
+Password hashes are deliberately CPU-expensive, so register and login hand them
+to a small dedicated thread pool instead of computing them inline. At most
+PASSWORD_HASH_WORKERS hashes run at once; a request that cannot get a slot
+within PASSWORD_HASH_QUEUE_TIMEOUT seconds fails with HashingBusy (503) rather
+than tying up a web worker behind a burst of logins. PASSWORD_HASH_METHOD
+selects the werkzeug hash parameters; stored hashes made with other parameters
+are upgraded on the next successful login.
+"""
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import threading
+import time
+
+class HashingBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout"""
+
+def _method_prefix(password_hash):
+    return password_hash.split('$', 1)[0] if password_hash else None
+
+class PasswordHasher:
+    """Runs password hashing on a bounded pool and records latency/queue metrics"""
+
+    def __init__(self, method='scrypt', workers=2, queue_timeout=5.0):
+        self.method = method
+        self.queue_timeout = queue_timeout
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+        self._latencies = deque(maxlen=1000)  # seconds spent hashing, most recent calls
+        self._waits = deque(maxlen=1000)  # seconds spent queued for a slot
+        # Canonical parameter string for the configured method, e.g. 'scrypt:32768:8:1'
+        self.current_prefix = _method_prefix(generate_password_hash('', method=method))
+
+    def _run(self, fn, *args):
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                self._rejected += 1
+        if not acquired:
+            raise HashingBusy('Password hashing is saturated')
+
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            finished_at = time.perf_counter()
+            self._slots.release()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._waits.append(started_at - queued_at)
+                self._latencies.append(finished_at - started_at)
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if a stored hash was made with parameters other than the configured ones"""
+        return _method_prefix(password_hash) != self.current_prefix
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = list(self._waits)
+            return {
+                'method': self.current_prefix,
+                'workers': self.workers,
+                'queue_depth': self._waiting,
+                'running': self._running,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'latency_ms_avg': 1000 * sum(latencies) / len(latencies) if latencies else None,
+                'latency_ms_p95': 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+                'queue_wait_ms_avg': 1000 * sum(waits) / len(waits) if waits else None,
+            }
+
+def init_password_hasher(app):
+    """Create the password hashing pool for this app (called from create_app)"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        queue_timeout=app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0),
+    )
+
+def get_password_hasher():
+    return current_app.extensions['password_hasher']
@@ -2,6 +2,7 @@
 AI Prompt templates for mentor feedback generation and routine generation.
 These prompts are used with OpenAI API to generate personalized content.
 """
+from streaks import serialize_streak
 
 # Single default system prompt for feedback generation
 DEFAULT_FEEDBACK_SYSTEM_PROMPT = """You are a no-nonsense, brutally honest mentor inspired by David Goggins.
@@ -50,7 +51,7 @@ HISTORICAL PERFORMANCE (Last 30 days):
 - Overall Compliance Rate: {avg_compliance}%
 
 Routine Completion Rates:
-{routine_stats}
+{routine_stats}{correlation_context}
 
 TASK:
 Generate brutally honest feedback that:
@@ -80,9 +81,40 @@ Target Duration: {target_duration} min | Actual: {actual_duration} min
 Difficulty Felt: {difficulty_felt}/10
 Notes: {notes}
 Historical Completion Rate: {historical_rate}%
+Streak: {current_streak} day(s) (best {longest_streak})
 """
 
-def build_feedback_prompt(user, daily_log, historical_data, routine_entries):
+CORRELATION_CONTEXT_TEMPLATE = """
+
+What Their Data Says Moves Their Wellbeing (completed vs missed days):
+{correlation_lines}"""
+
+def format_correlation_context(report, limit=3):
+    """
+    Strongest routine/wellbeing relationships from analytics.correlation_report,
+    as prompt lines. Returns an empty string when nothing clears the sample minimums.
+    """
+    if not report:
+        return ""
+    when = {0: "the same day", 1: "the next day"}
+    findings = []
+    for routine in report.get('routines', []):
+        for lag, metrics in routine['by_lag'].items():
+            for metric, result in metrics.items():
+                if result['correlation'] is None or result['lift'] is None:
+                    continue
+                findings.append((abs(result['correlation']), routine['name'], int(lag), metric, result))
+    findings.sort(key=lambda finding: finding[0], reverse=True)
+    
+    lines = ""
+    for _, name, lag, metric, result in findings[:limit]:
+        lines += (
+            f"- {name}: {metric} {result['lift']:+.1f}/10 {when.get(lag, f'{lag} days later')} "
+            f"when completed (r={result['correlation']:.2f}, {result['paired_days']} days)\n"
+        )
+    return CORRELATION_CONTEXT_TEMPLATE.format(correlation_lines=lines) if lines else ""
+
+def build_feedback_prompt(user, daily_log, historical_data, routine_entries, correlations=None):
     """
     Build a complete feedback prompt for OpenAI API.
     
@@ -91,6 +123,7 @@ def build_feedback_prompt(user, daily_log, historical_data, routine_entries):
         daily_log: DailyLog object for today
         historical_data: Dict with historical performance stats
         routine_entries: List of RoutineEntry objects for today
+        correlations: Optional analytics.correlation_report to add routine/wellbeing findings
     
     Returns:
         String prompt ready for OpenAI API
@@ -100,6 +133,7 @@ def build_feedback_prompt(user, daily_log, historical_data, routine_entries):
     routine_performance = ""
     for entry in routine_entries:
         historical_rate = historical_data.get('routine_stats', {}).get(entry.routine.name, {}).get('completion_rate', 0)
+        streak = serialize_streak(entry.routine, today=daily_log.log_date)
         routine_performance += ROUTINE_PERFORMANCE_TEMPLATE.format(
             routine_name=entry.routine.name,
             status=entry.status,
@@ -108,7 +142,9 @@ def build_feedback_prompt(user, daily_log, historical_data, routine_entries):
             actual_duration=entry.actual_duration or 0,
             difficulty_felt=entry.difficulty_felt or "N/A",
             notes=entry.notes or "No notes",
-            historical_rate=f"{historical_rate:.0f}" if historical_rate else "N/A"
+            historical_rate=f"{historical_rate:.0f}" if historical_rate else "N/A",
+            current_streak=streak['current_streak'],
+            longest_streak=streak['longest_streak']
         )
     
     # Format routine stats
@@ -137,7 +173,8 @@ def build_feedback_prompt(user, daily_log, historical_data, routine_entries):
         worst_routine=historical_data.get('worst_routine', "N/A"),
         worst_routine_rate=f"{historical_data.get('routine_stats', {}).get(historical_data.get('worst_routine', ''), {}).get('completion_rate', 0):.0f}" if historical_data.get('worst_routine') else "N/A",
         avg_compliance=f"{sum(s['completion_rate'] for s in historical_data.get('routine_stats', {}).values()) / len(historical_data.get('routine_stats', {})):.0f}" if historical_data.get('routine_stats') else "N/A",
-        routine_stats=routine_stats or "No historical data"
+        routine_stats=routine_stats or "No historical data",
+        correlation_context=format_correlation_context(correlations)
     )
     
     return prompt
@@ -212,3 +249,45 @@ Write a short summary (5–7 sentences) that:
 - Is direct and scannable; no lists, just a cohesive paragraph.
 """
 
+
+# ---------------------- Single-call Routine Plan ----------------------
+
+# Used when ROUTINE_GENERATION_MODE is 'single': routines and summary in one structured response
+ROUTINE_PLAN_SYSTEM_PROMPT = """You are a helpful coach who designs realistic daily routines
+aligned with user goals, and explains the plan in a concise, empathetic summary.
+Always return strictly valid JSON matching the provided schema."""
+
+ROUTINE_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "routines": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "description": {"type": "string"},
+                    "category": {"type": "string", "enum": ["health", "work", "personal", "social"]},
+                    "frequency": {"type": "string"},
+                    "target_duration": {"type": "integer"},
+                    "priority": {"type": "integer"},
+                },
+                "required": ["name", "description", "category", "frequency", "target_duration", "priority"],
+                "additionalProperties": False,
+            },
+        },
+        "summary": {"type": "string"},
+    },
+    "required": ["routines", "summary"],
+    "additionalProperties": False,
+}
+
+def build_routine_plan_user_prompt(user, goals: str, challenges: str, unavailable_times: str, desired_routines: str):
+    routine_prompt = build_routine_generation_user_prompt(user, goals, challenges, unavailable_times, desired_routines)
+    return routine_prompt + """
+Additionally:
+- Add a top-level key "summary" next to "routines".
+- "summary" is a short (5–7 sentences) cohesive paragraph that reflects the user's situation and
+  constraints, explains why these routines were chosen and how they support the goals, in a
+  balanced, encouraging tone. No lists.
+"""
@@ -0,0 +1,51 @@
+"""
+Per-request SQL query accounting.
+
+Counts the statements (and time spent in them) issued while handling each
+request. With QUERY_STATS_HEADERS enabled the totals are returned as
+X-Query-Count / X-Query-Time-Ms response headers, and any request issuing more
+than QUERY_BUDGET statements is logged so N+1 patterns show up early.
+"""
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from models import db
+import time
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and conn.info.get('query_started_at'):
+        elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+        g.query_count = g.get('query_count', 0) + 1
+        g.query_time = g.get('query_time', 0.0) + elapsed
+
+def init_query_stats(app):
+    """Attach query counting to the app's engine and requests (called from create_app)"""
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def reset_query_stats():
+        g.query_count = 0
+        g.query_time = 0.0
+
+    @app.after_request
+    def report_query_stats(response):
+        count = g.get('query_count', 0)
+        elapsed_ms = g.get('query_time', 0.0) * 1000
+
+        if app.config.get('QUERY_STATS_HEADERS'):
+            response.headers['X-Query-Count'] = str(count)
+            response.headers['X-Query-Time-Ms'] = f"{elapsed_ms:.2f}"
+
+        budget = app.config.get('QUERY_BUDGET')
+        if budget is not None and count > budget:
+            app.logger.warning(
+                f"{request.method} {request.path} issued {count} queries "
+                f"({elapsed_ms:.1f} ms), over the budget of {budget}"
+            )
+        return response
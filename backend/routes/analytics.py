@@ -0,0 +1,62 @@
+from flask import Blueprint, request, jsonify
+from routes.auth import token_claims_required
+from etags import conditional_get
+from pagination import parse_date_arg
+from analytics import wellbeing_report, correlation_report, MAX_LAG
+
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+MAX_WINDOW = 365
+MAX_LAGS = 4
+MAX_RANGE_DAYS = 3660
+
+def _parse_range():
+    """(date_from, date_to) from the query string. Raises ValueError with a client-facing message."""
+    date_from = parse_date_arg('from')
+    date_to = parse_date_arg('to')
+    if date_from and date_to and date_from > date_to:
+        raise ValueError('from must not be after to')
+    if date_from and date_to and (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'date range must not exceed {MAX_RANGE_DAYS} days')
+    return date_from, date_to
+
+@analytics_bp.route('/wellbeing', methods=['GET'])
+@token_claims_required
+@conditional_get('daily_logs')
+def get_wellbeing(current_user):
+    """Get rolling, weekly and day-of-week mood/energy/stress trends over an optional date range"""
+    try:
+        date_from, date_to = _parse_range()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        window = int(request.args.get('window', 7))
+    except ValueError:
+        return jsonify({'message': 'window must be an integer'}), 400
+    if not 1 <= window <= MAX_WINDOW:
+        return jsonify({'message': f'window must be between 1 and {MAX_WINDOW}'}), 400
+
+    return jsonify(wellbeing_report(current_user.id, date_from, date_to, window)), 200
+
+@analytics_bp.route('/correlations', methods=['GET'])
+@token_claims_required
+@conditional_get('daily_logs', 'routines')
+def get_correlations(current_user):
+    """
+    Get how completing each routine relates to mood/energy/stress.
+    lag=0,1 pairs a day's completions with wellbeing the same day and the day after.
+    """
+    try:
+        date_from, date_to = _parse_range()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        lags = [int(part) for part in request.args.get('lag', '0').split(',') if part.strip()]
+    except ValueError:
+        return jsonify({'message': 'lag must be a comma-separated list of integers'}), 400
+    if not lags or len(lags) > MAX_LAGS or not all(0 <= lag <= MAX_LAG for lag in lags):
+        return jsonify({'message': f'lag must list 1 to {MAX_LAGS} values between 0 and {MAX_LAG}'}), 400
+
+    return jsonify(correlation_report(current_user.id, date_from, date_to, lags)), 200
@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from models import db, User
+from ttl_cache import TTLCache
+from passwords import HashingBusy, get_password_hasher
 from functools import wraps
 import jwt
 import os
@@ -10,35 +14,120 @@ auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
 
+class TokenPrincipal:
+    """Authenticated identity built purely from verified JWT claims (no DB access)"""
+    def __init__(self, user_id, username):
+        self.id = user_id
+        self.username = username
+
+def init_auth_cache(app):
+    """Create the authenticated-user cache for this app (called from create_app)"""
+    cache = None
+    if app.config.get('AUTH_CACHE_ENABLED'):
+        cache = TTLCache(
+            maxsize=app.config.get('AUTH_CACHE_MAX_ENTRIES', 10000),
+            ttl=app.config.get('AUTH_CACHE_TTL', 300)
+        )
+    app.extensions['auth_cache'] = cache
+
+def invalidate_cached_user(user_id):
+    """Drop every cached profile version of a user"""
+    cache = current_app.extensions.get('auth_cache')
+    if cache is not None:
+        cache.invalidate(lambda key: key[0] == user_id)
+
+def _detached_copy(user):
+    """Clean, session-independent copy of a loaded user's column state"""
+    copy = User()
+    for attr in inspect(User).column_attrs:
+        set_committed_value(copy, attr.key, getattr(user, attr.key))
+    make_transient_to_detached(copy)
+    return copy
+
+def _load_current_user(data):
+    """Resolve token claims to a User, from the cache when the profile version matches"""
+    cache = current_app.extensions.get('auth_cache')
+    key = (data['user_id'], data.get('pv'))
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            # Attach a copy to this request's session without re-selecting the row
+            return db.session.merge(cached, load=False)
+    
+    user = db.session.get(User, data['user_id'])
+    if user and cache is not None:
+        cache.set(key, _detached_copy(user))
+    return user
+
+def _decode_request_token():
+    """Return (claims, None) for a valid bearer token, or (None, error response)"""
+    token = None
+    if 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        try:
+            token = auth_header.split(" ")[1]
+        except IndexError:
+            return None, (jsonify({'message': 'Invalid token format'}), 401)
+    
+    if not token:
+        return None, (jsonify({'message': 'Token is missing'}), 401)
+    
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=['HS256']), None
+    except jwt.ExpiredSignatureError:
+        return None, (jsonify({'message': 'Token has expired'}), 401)
+    except jwt.InvalidTokenError:
+        return None, (jsonify({'message': 'Invalid token'}), 401)
+
 def token_required(f):
     """Decorator to check JWT token"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]
-            except IndexError:
-                return jsonify({'message': 'Invalid token format'}), 401
+        data, error = _decode_request_token()
+        if error:
+            return error
         
-        if not token:
-            return jsonify({'message': 'Token is missing'}), 401
-        
-        try:
-            data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-            current_user = User.query.get(data['user_id'])
-            if not current_user:
-                return jsonify({'message': 'User not found'}), 404
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Invalid token'}), 401
+        current_user = _load_current_user(data)
+        if not current_user:
+            return jsonify({'message': 'User not found'}), 404
         
         return f(current_user, *args, **kwargs)
     
     return decorated
 
+def token_claims_required(f):
+    """
+    Decorator to check JWT token without loading the user.
+    For read-only endpoints that only need the caller's id; passes a TokenPrincipal.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        data, error = _decode_request_token()
+        if error:
+            return error
+        
+        return f(TokenPrincipal(data['user_id'], data.get('username')), *args, **kwargs)
+    
+    return decorated
+
+def _issue_token(user):
+    """Generate JWT token (24 hour expiration) carrying the profile version"""
+    return jwt.encode(
+        {
+            'user_id': user.id,
+            'username': user.username,
+            'pv': user.profile_version,
+            'exp': datetime.utcnow() + timedelta(hours=24)
+        },
+        SECRET_KEY,
+        algorithm='HS256'
+    )
+
+def _busy_response():
+    response = jsonify({'message': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -51,11 +140,16 @@ def register():
     if User.query.filter_by(username=data['username']).first():
         return jsonify({'message': 'Username already exists'}), 409
     
+    try:
+        password_hash = get_password_hasher().hash(data['password'])
+    except HashingBusy:
+        return _busy_response()
+    
     # Create new user
     user = User(
         username=data['username'],
         email=data.get('email', f"{data['username']}@temp.local"),
-        password_hash=generate_password_hash(data['password']),
+        password_hash=password_hash,
         first_name=data.get('first_name', ''),
         last_name=data.get('last_name', '')
     )
@@ -77,20 +171,21 @@ def login():
         return jsonify({'message': 'Missing username or password'}), 400
     
     user = User.query.filter_by(username=data['username']).first()
+    hasher = get_password_hasher()
     
-    if not user or not check_password_hash(user.password_hash, data['password']):
-        return jsonify({'message': 'Invalid credentials'}), 401
+    try:
+        if not user or not hasher.verify(user.password_hash, data['password']):
+            return jsonify({'message': 'Invalid credentials'}), 401
+        
+        # Upgrade hashes made with old parameters while we have the plaintext
+        if hasher.needs_rehash(user.password_hash):
+            user.password_hash = hasher.hash(data['password'])
+            db.session.commit()
+    except HashingBusy:
+        return _busy_response()
     
     # Generate JWT token (24 hour expiration)
-    token = jwt.encode(
-        {
-            'user_id': user.id,
-            'username': user.username,
-            'exp': datetime.utcnow() + timedelta(hours=24)
-        },
-        SECRET_KEY,
-        algorithm='HS256'
-    )
+    token = _issue_token(user)
     
     return jsonify({
         'message': 'Login successful',
@@ -127,10 +222,17 @@ def update_profile(current_user):
         current_user.goals = data['goals']
 
     current_user.updated_at = datetime.utcnow()
+    # Increment in SQL: current_user may be a stale cached copy, and reusing its
+    # version could reissue one another worker has already handed out
+    current_user.profile_version = User.profile_version + 1
     db.session.commit()
+    db.session.refresh(current_user)
+    invalidate_cached_user(current_user.id)
 
     return jsonify({
         'message': 'Profile updated successfully',
+        # Token carrying the new profile version, so other workers stop serving cached profiles
+        'token': _issue_token(current_user),
         'user': {
             'username': current_user.username,
             'email': current_user.email,
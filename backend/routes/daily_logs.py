@@ -1,17 +1,134 @@
-from flask import Blueprint, request, jsonify
-from models import db, DailyLog, RoutineEntry, Routine, User
-from routes.auth import token_required
+from flask import Blueprint, request, jsonify, current_app, url_for
+from models import db, DailyLog, RoutineEntry, Routine, Feedback, User
+from routes.auth import token_required, token_claims_required
+from etags import conditional_get
+from upserts import insert_or_ignore
+from streaks import record_entry_streaks
+from jobs import enqueue_job, serialize_job
+from routes.feedback import (
+    find_or_create_feedback_job, run_feedback_job,
+    generate_ai_feedback, save_feedback, serialize_feedback
+)
+from stats import snapshot_log, record_log_change, record_entry_change, record_entry_changes
+from pagination import parse_page_args, filter_date_range, keyset_page
+from sqlalchemy.orm import joinedload, selectinload, undefer
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 
 daily_logs_bp = Blueprint('daily_logs', __name__, url_prefix='/api/daily-logs')
 
+# Client-writable routine entry fields
+ENTRY_FIELDS = ('status', 'completion_percentage', 'actual_duration', 'difficulty_felt', 'notes')
+
+def upsert_routine_entries(user_id, log, items):
+    """
+    Create or update a day's routine entries in the current transaction (caller commits).
+
+    Routine ownership is checked with one IN query and the log's existing entries
+    for those routines are loaded with another; stats are updated in one batch.
+    The log must already have an id.
+
+    Returns:
+        List of per-item result dicts, in request order
+    """
+    results = [None] * len(items)
+    wanted = {}  # routine_id -> index of the item writing it
+    for i, item in enumerate(items):
+        routine_id = item.get('routine_id') if isinstance(item, dict) else None
+        if not isinstance(routine_id, int) or isinstance(routine_id, bool):
+            results[i] = {'routine_id': routine_id, 'result': 'error', 'message': 'routine_id is required'}
+        elif routine_id in wanted:
+            results[i] = {'routine_id': routine_id, 'result': 'error', 'message': 'Duplicate routine_id in request'}
+        else:
+            wanted[routine_id] = i
+
+    owned = set()
+    if wanted:
+        owned = {rid for (rid,) in db.session.query(Routine.id).filter(
+            Routine.user_id == user_id,
+            Routine.id.in_(wanted)
+        )}
+    existing = {}
+    if owned:
+        existing = {e.routine_id: e for e in RoutineEntry.query.filter(
+            RoutineEntry.daily_log_id == log.id,
+            RoutineEntry.routine_id.in_(owned)
+        )}
+
+    written = []
+    changes = []
+    for routine_id, i in wanted.items():
+        if routine_id not in owned:
+            results[i] = {'routine_id': routine_id, 'result': 'error', 'message': 'Routine not found'}
+            continue
+
+        entry = existing.get(routine_id)
+        before_status = entry.status if entry else None
+        if entry is None:
+            entry = RoutineEntry(
+                routine_id=routine_id,
+                daily_log_id=log.id,
+                status='not_done',
+                completion_percentage=0,
+                notes=''
+            )
+            db.session.add(entry)
+        for field in ENTRY_FIELDS:
+            if field in items[i]:
+                setattr(entry, field, items[i][field])
+
+        changes.append((routine_id, before_status, entry.status))
+        written.append((i, entry, 'created' if before_status is None else 'updated'))
+
+    record_entry_changes(user_id, changes)
+    record_entry_streaks(log.log_date, changes)
+    db.session.flush()
+
+    for i, entry, result in written:
+        results[i] = {'routine_id': entry.routine_id, 'entry_id': entry.id, 'result': result}
+    return results
+
+def serialize_log_detail(log, routine_entries):
+    """Daily log with its routine entries (each entry's routine should be loaded)"""
+    return {
+        'id': log.id,
+        'log_date': log.log_date.isoformat(),
+        'mood': log.mood,
+        'energy_level': log.energy_level,
+        'stress_level': log.stress_level,
+        'notes': log.notes,
+        'highlights': log.highlights,
+        'challenges': log.challenges,
+        'routine_entries': [{
+            'id': entry.id,
+            'routine_id': entry.routine_id,
+            'routine_name': entry.routine.name,
+            'status': entry.status,
+            'completion_percentage': entry.completion_percentage,
+            'actual_duration': entry.actual_duration,
+            'difficulty_felt': entry.difficulty_felt,
+            'notes': entry.notes
+        } for entry in routine_entries],
+        'created_at': log.created_at.isoformat()
+    }
+
 @daily_logs_bp.route('', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('daily_logs')
 def get_daily_logs(current_user):
-    """Get all daily logs for current user"""
-    logs = DailyLog.query.filter_by(user_id=current_user.id).order_by(DailyLog.log_date.desc()).all()
+    """Get a page of daily logs for current user, newest first"""
+    try:
+        page = parse_page_args()
+        query = filter_date_range(
+            DailyLog.query.filter_by(user_id=current_user.id).options(undefer(DailyLog.routine_entries_count)),
+            DailyLog.log_date, page['from'], page['to']
+        )
+        logs, next_cursor = keyset_page(query, DailyLog.log_date, DailyLog.id, page['limit'], page['cursor'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
+        'next_cursor': next_cursor,
         'logs': [{
             'id': log.id,
             'log_date': log.log_date.isoformat(),
@@ -22,12 +139,13 @@ def get_daily_logs(current_user):
             'highlights': log.highlights,
             'challenges': log.challenges,
             'created_at': log.created_at.isoformat(),
-            'routine_entries_count': len(log.routine_entries)
+            'routine_entries_count': log.routine_entries_count
         } for log in logs]
     }), 200
 
 @daily_logs_bp.route('/date/<date_str>', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('daily_logs', 'routines')
 def get_daily_log_by_date(current_user, date_str):
     """Get daily log for specific date"""
     try:
@@ -35,35 +153,15 @@ def get_daily_log_by_date(current_user, date_str):
     except ValueError:
         return jsonify({'message': 'Invalid date format (use YYYY-MM-DD)'}), 400
     
-    log = DailyLog.query.filter_by(user_id=current_user.id, log_date=log_date).first()
+    log = DailyLog.query.filter_by(user_id=current_user.id, log_date=log_date).options(
+        selectinload(DailyLog.routine_entries).joinedload(RoutineEntry.routine)
+    ).first()
     
     if not log:
         return jsonify({'message': 'Daily log not found for this date'}), 404
     
-    routine_entries = [{
-        'id': entry.id,
-        'routine_id': entry.routine_id,
-        'routine_name': entry.routine.name,
-        'status': entry.status,
-        'completion_percentage': entry.completion_percentage,
-        'actual_duration': entry.actual_duration,
-        'difficulty_felt': entry.difficulty_felt,
-        'notes': entry.notes
-    } for entry in log.routine_entries]
-    
     return jsonify({
-        'log': {
-            'id': log.id,
-            'log_date': log.log_date.isoformat(),
-            'mood': log.mood,
-            'energy_level': log.energy_level,
-            'stress_level': log.stress_level,
-            'notes': log.notes,
-            'highlights': log.highlights,
-            'challenges': log.challenges,
-            'routine_entries': routine_entries,
-            'created_at': log.created_at.isoformat()
-        }
+        'log': serialize_log_detail(log, log.routine_entries)
     }), 200
 
 @daily_logs_bp.route('', methods=['POST'])
@@ -72,17 +170,9 @@ def create_daily_log(current_user):
     """Create a new daily log"""
     data = request.get_json()
     
-    # Get or create log for today
+    # One INSERT ... ON CONFLICT; the (user_id, log_date) constraint rejects a second log for today
     today = date.today()
-    existing_log = DailyLog.query.filter_by(user_id=current_user.id, log_date=today).first()
-    
-    if existing_log:
-        return jsonify({
-            'message': 'Daily log already exists for today',
-            'log_id': existing_log.id
-        }), 409
-    
-    log = DailyLog(
+    values = dict(
         user_id=current_user.id,
         log_date=today,
         mood=data.get('mood'),
@@ -92,14 +182,23 @@ def create_daily_log(current_user):
         highlights=data.get('highlights', ''),
         challenges=data.get('challenges', '')
     )
+    log_id = insert_or_ignore(DailyLog, values, ['user_id', 'log_date'], current_user.id, 'daily_logs')
     
-    db.session.add(log)
+    if log_id is None:
+        existing_log_id = db.session.query(DailyLog.id).filter_by(user_id=current_user.id, log_date=today).scalar()
+        db.session.rollback()
+        return jsonify({
+            'message': 'Daily log already exists for today',
+            'log_id': existing_log_id
+        }), 409
+    
+    record_log_change(current_user.id, None, (values['mood'], values['energy_level'], values['stress_level']))
     db.session.commit()
     
     return jsonify({
         'message': 'Daily log created successfully',
-        'log_id': log.id,
-        'log_date': log.log_date.isoformat()
+        'log_id': log_id,
+        'log_date': today.isoformat()
     }), 201
 
 @daily_logs_bp.route('/<int:log_id>', methods=['PUT'])
@@ -112,6 +211,7 @@ def update_daily_log(current_user, log_id):
         return jsonify({'message': 'Daily log not found'}), 404
     
     data = request.get_json()
+    before = snapshot_log(log)
     
     if 'mood' in data:
         log.mood = data['mood']
@@ -127,6 +227,7 @@ def update_daily_log(current_user, log_id):
         log.challenges = data['challenges']
     
     log.updated_at = datetime.utcnow()
+    record_log_change(current_user.id, before, snapshot_log(log))
     db.session.commit()
     
     return jsonify({
@@ -153,13 +254,9 @@ def add_routine_entry(current_user, log_id):
     if not routine:
         return jsonify({'message': 'Routine not found'}), 404
     
-    # Check if entry already exists
-    existing = RoutineEntry.query.filter_by(routine_id=data['routine_id'], daily_log_id=log_id).first()
-    if existing:
-        return jsonify({'message': 'Routine entry already exists for this day'}), 409
-    
-    entry = RoutineEntry(
-        routine_id=data['routine_id'],
+    # One INSERT ... ON CONFLICT; the (daily_log_id, routine_id) constraint rejects duplicates
+    values = dict(
+        routine_id=routine.id,
         daily_log_id=log_id,
         status=data.get('status', 'not_done'),
         completion_percentage=data.get('completion_percentage', 0),
@@ -167,13 +264,18 @@ def add_routine_entry(current_user, log_id):
         difficulty_felt=data.get('difficulty_felt'),
         notes=data.get('notes', '')
     )
+    entry_id = insert_or_ignore(RoutineEntry, values, ['daily_log_id', 'routine_id'], current_user.id, 'daily_logs')
+    if entry_id is None:
+        db.session.rollback()
+        return jsonify({'message': 'Routine entry already exists for this day'}), 409
     
-    db.session.add(entry)
+    record_entry_change(current_user.id, routine.id, None, values['status'])
+    record_entry_streaks(log.log_date, [(routine.id, None, values['status'])])
     db.session.commit()
     
     return jsonify({
         'message': 'Routine entry added successfully',
-        'entry_id': entry.id
+        'entry_id': entry_id
     }), 201
 
 @daily_logs_bp.route('/routine-entry/<int:entry_id>', methods=['PUT'])
@@ -189,6 +291,7 @@ def update_routine_entry(current_user, entry_id):
         return jsonify({'message': 'Routine entry not found'}), 404
     
     data = request.get_json()
+    before_status = entry.status
     
     if 'status' in data:
         entry.status = data['status']
@@ -201,9 +304,132 @@ def update_routine_entry(current_user, entry_id):
     if 'notes' in data:
         entry.notes = data['notes']
     
+    record_entry_change(current_user.id, entry.routine_id, before_status, entry.status)
+    record_entry_streaks(entry.daily_log.log_date, [(entry.routine_id, before_status, entry.status)])
     db.session.commit()
     
     return jsonify({
         'message': 'Routine entry updated successfully',
         'entry_id': entry.id
     }), 200
+
+@daily_logs_bp.route('/<int:log_id>/routine-entries', methods=['PUT'])
+@token_required
+def put_routine_entries(current_user, log_id):
+    """Create or update many routine entries of a daily log in one transaction"""
+    data = request.get_json()
+    items = data.get('entries') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({'message': 'entries must be a list'}), 400
+    
+    log = DailyLog.query.filter_by(id=log_id, user_id=current_user.id).first()
+    if not log:
+        return jsonify({'message': 'Daily log not found'}), 404
+    
+    for attempt in range(2):
+        try:
+            results = upsert_routine_entries(current_user.id, log, items)
+            db.session.commit()
+            break
+        except IntegrityError:
+            # A concurrent request created one of these entries first; retry as an update
+            db.session.rollback()
+            if attempt:
+                return jsonify({'message': 'Routine entries were modified concurrently, please retry'}), 409
+    
+    return jsonify({
+        'message': 'Routine entries saved',
+        'log_id': log_id,
+        'created': sum(1 for r in results if r['result'] == 'created'),
+        'updated': sum(1 for r in results if r['result'] == 'updated'),
+        'errors': sum(1 for r in results if r['result'] == 'error'),
+        'results': results
+    }), 200
+
+@daily_logs_bp.route('/close', methods=['POST'])
+@token_required
+def close_day(current_user):
+    """
+    Finish today in one request: create or update today's log, write its routine
+    entries and request feedback. The log and entries commit first; inline
+    feedback is then generated and saved in a second, short transaction so no
+    row locks are held across the LLM call.
+
+    Body: log fields, optional 'entries' (as for PUT .../routine-entries) and
+    'feedback': 'async' (default, queue a job), 'inline' (generate now) or 'none'.
+    """
+    data = request.get_json() or {}
+    items = data.get('entries', [])
+    feedback_mode = data.get('feedback', 'async')
+    if not isinstance(items, list):
+        return jsonify({'message': 'entries must be a list'}), 400
+    if feedback_mode not in ('async', 'inline', 'none'):
+        return jsonify({'message': "feedback must be 'async', 'inline' or 'none'"}), 400
+    
+    for attempt in range(2):
+        try:
+            today = date.today()
+            log = DailyLog.query.filter_by(user_id=current_user.id, log_date=today).first()
+            created = log is None
+            if created:
+                log = DailyLog(user_id=current_user.id, log_date=today, notes='', highlights='', challenges='')
+                db.session.add(log)
+                before = None
+            else:
+                before = snapshot_log(log)
+                log.updated_at = datetime.utcnow()
+            
+            for field in ('mood', 'energy_level', 'stress_level', 'notes', 'highlights', 'challenges'):
+                if field in data:
+                    setattr(log, field, data[field])
+            record_log_change(current_user.id, before, snapshot_log(log))
+            db.session.flush()
+            
+            results = upsert_routine_entries(current_user.id, log, items)
+            
+            feedback = Feedback.query.filter_by(daily_log_id=log.id).first()
+            job = job_created = None
+            if feedback is None and feedback_mode == 'async':
+                job, job_created = find_or_create_feedback_job(current_user.id, log.id)
+            
+            db.session.commit()
+            break
+        except IntegrityError:
+            # A concurrent request wrote part of this day first; retry against its rows
+            db.session.rollback()
+            if attempt:
+                return jsonify({'message': 'Daily log was modified concurrently, please retry'}), 409
+    
+    if feedback is None and feedback_mode == 'inline':
+        feedback_data = generate_ai_feedback(current_user, log)
+        feedback = save_feedback(current_user, log, feedback_data)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request saved feedback for this log while we were generating
+            db.session.rollback()
+            feedback = Feedback.query.filter_by(daily_log_id=log.id).first()
+    
+    if job_created:
+        enqueue_job(current_app._get_current_object(), job.id, run_feedback_job)
+        db.session.refresh(job)
+    
+    routine_entries = RoutineEntry.query.filter_by(daily_log_id=log.id).options(
+        joinedload(RoutineEntry.routine)
+    ).order_by(RoutineEntry.id).all()
+    
+    body = {
+        'message': 'Daily log created and closed' if created else 'Daily log updated and closed',
+        'log': serialize_log_detail(log, routine_entries),
+        'results': results,
+        'feedback': serialize_feedback(feedback) if feedback else None,
+        'job': serialize_job(job) if job else None
+    }
+    if job and job.status == 'succeeded' and job.feedback:
+        body['feedback'] = serialize_feedback(job.feedback)
+    
+    response = jsonify(body)
+    if job and not body['feedback']:
+        response.headers['Location'] = url_for('feedback.get_feedback_job', job_id=job.id)
+        return response, 202
+    return response, 201 if created else 200
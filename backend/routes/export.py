@@ -0,0 +1,112 @@
+from flask import Blueprint, Response, current_app, stream_with_context
+from models import db, User, Routine, DailyLog, RoutineEntry, Feedback
+from routes.auth import token_claims_required
+from routes.routines import serialize_routine
+from routes.sync import serialize_log, serialize_entry, serialize_feedback_row
+from changes import current_change_seq, encode_sync_token
+from datetime import datetime, date
+import click
+import json
+import sys
+import time
+
+export_bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+EXPORT_FORMAT_VERSION = 1
+
+def _line(record_type, data):
+    return json.dumps({'type': record_type, 'data': data}, separators=(',', ':'), default=str) + '\n'
+
+def _use_snapshot():
+    """
+    On PostgreSQL, read every section from one snapshot so the export is consistent.
+    The isolation level only takes effect on the transaction's first connection, so
+    a transaction already begun (e.g. by the auth user lookup) is ended first.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        if db.session().in_transaction():
+            db.session.commit()
+        db.session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+
+def iter_user_export(user_id, batch_size=500):
+    """
+    Yield a user's full history as NDJSON chunks.
+
+    The first line is an 'export' header (including a sync token, so a client can
+    continue with /api/sync from here), then one line per routine, daily log,
+    routine entry and feedback row, and finally an 'end' line with per-type counts.
+    Rows are read with yield_per(batch_size) and emitted batch_size lines at a time,
+    so memory stays flat regardless of history length.
+    """
+    _use_snapshot()
+    head = current_change_seq(db.session, user_id)
+    yield _line('export', {
+        'version': EXPORT_FORMAT_VERSION,
+        'user_id': user_id,
+        'exported_at': datetime.utcnow().isoformat(),
+        'sync_token': encode_sync_token(user_id, head)
+    })
+
+    sections = [
+        ('routine', Routine.query.filter_by(user_id=user_id).order_by(Routine.id), serialize_routine),
+        ('daily_log', DailyLog.query.filter_by(user_id=user_id).order_by(DailyLog.log_date, DailyLog.id), serialize_log),
+        ('routine_entry', RoutineEntry.query.join(DailyLog, DailyLog.id == RoutineEntry.daily_log_id).filter(
+            DailyLog.user_id == user_id
+        ).order_by(RoutineEntry.id), serialize_entry),
+        ('feedback', Feedback.query.filter_by(user_id=user_id).order_by(Feedback.id), serialize_feedback_row),
+    ]
+    counts = {}
+    for record_type, query, serialize in sections:
+        counts[record_type] = 0
+        chunk = []
+        for row in query.yield_per(batch_size):
+            chunk.append(_line(record_type, serialize(row)))
+            if len(chunk) >= batch_size:
+                counts[record_type] += len(chunk)
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            counts[record_type] += len(chunk)
+            yield ''.join(chunk)
+    yield _line('end', {'counts': counts})
+
+@export_bp.route('', methods=['GET'])
+@token_claims_required
+def export_history(current_user):
+    """Stream the current user's routines, logs, entries and feedback as NDJSON"""
+    filename = f"aura-export-{current_user.id}-{date.today().isoformat()}.ndjson"
+    chunks = iter_user_export(current_user.id, current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(stream_with_context(chunks), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
+@export_bp.cli.command('user')
+@click.option('--user-id', type=int, default=None, help='User to export.')
+@click.option('--username', default=None, help='User to export, by username.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='File to write (default: stdout).')
+@click.option('--batch-size', type=int, default=None, help='Rows fetched and written per batch.')
+def export_user_command(user_id, username, output, batch_size):
+    """Export one user's full history as NDJSON"""
+    if user_id is None and username:
+        user = User.query.filter_by(username=username).first()
+        user_id = user.id if user else None
+    elif user_id is not None and db.session.get(User, user_id) is None:
+        user_id = None
+    if user_id is None:
+        raise click.UsageError('Pass the --user-id or --username of an existing user')
+
+    started = time.perf_counter()
+    lines = 0
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    try:
+        for chunk in iter_user_export(user_id, batch_size or current_app.config['EXPORT_BATCH_SIZE']):
+            out.write(chunk)
+            lines += chunk.count('\n')
+    finally:
+        if output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    click.echo(f"Exported {lines} line(s) for user {user_id} in {elapsed:.1f}s", err=True)
@@ -1,55 +1,75 @@
-from flask import Blueprint, request, jsonify
-from models import db, Feedback, DailyLog, RoutineEntry, Routine
-from routes.auth import token_required
-from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, url_for
+from models import db, Feedback, FeedbackJob, DailyLog, RoutineEntry, User
+from routes.auth import token_required, token_claims_required
+from etags import conditional_get
+from datetime import datetime, date
 from prompts import DEFAULT_FEEDBACK_SYSTEM_PROMPT, build_feedback_prompt
-import os
+from stats import load_historical_stats, rebuild_all_stats
+from analytics import correlation_report
+from jobs import ACTIVE_STATUSES, enqueue_job, drain_queued_jobs, serialize_job, is_stale
+from batch import partition, run_partitioned
+from pagination import parse_page_args, filter_date_range, keyset_page
+from llm import chat_completion, llm_available, stream_chat_completion
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
+import click
+import json
+import time
 
 feedback_bp = Blueprint('feedback', __name__, url_prefix='/api/feedback')
 
+def load_routine_entries(daily_log):
+    """Load a log's routine entries with their routines in a single query"""
+    return RoutineEntry.query.options(joinedload(RoutineEntry.routine)).filter_by(
+        daily_log_id=daily_log.id
+    ).order_by(RoutineEntry.id).all()
+
+def load_feedback_correlations(user):
+    """Routine/wellbeing correlations for the feedback prompt (cached), or None when disabled"""
+    if not current_app.config.get('FEEDBACK_CORRELATIONS'):
+        return None
+    return correlation_report(user.id, lags=(0, 1))
+
 # Placeholder for AI feedback generator (will implement with OpenAI)
 def generate_ai_feedback(user, daily_log):
     """
     Generate AI feedback based on today's log, all user routines, and historical performance.
     Uses OpenAI API if available, falls back to rule-based generation.
     """
-    routine_entries = daily_log.routine_entries
-    all_user_logs = DailyLog.query.filter_by(user_id=user.id).all()
-    historical_data = analyze_historical_performance(user, all_user_logs)
-    
-    # Try to use OpenAI API if key is set
-    openai_key = os.getenv('OPENAI_API_KEY')
-    if openai_key and openai_key != 'your-api-key-here':
-        return generate_ai_feedback_openai(user, daily_log, historical_data, routine_entries, openai_key)
+    routine_entries = load_routine_entries(daily_log)
+    historical_data = analyze_historical_performance(user)
+    
+    # Try to use the LLM if configured
+    if llm_available():
+        return generate_ai_feedback_openai(user, daily_log, historical_data, routine_entries)
     else:
         # Fall back to rule-based generation
         return generate_ai_feedback_rule_based(user, daily_log, historical_data, routine_entries)
 
-def generate_ai_feedback_openai(user, daily_log, historical_data, routine_entries, openai_key):
+def generate_ai_feedback_openai(user, daily_log, historical_data, routine_entries):
     """
     Generate feedback using OpenAI API.
     Requires OPENAI_API_KEY environment variable.
     """
     try:
-        import openai
-        openai.api_key = openai_key
-        
         # Build the prompt
         system_prompt = DEFAULT_FEEDBACK_SYSTEM_PROMPT
-        user_prompt = build_feedback_prompt(user, daily_log, historical_data, routine_entries)
+        user_prompt = build_feedback_prompt(
+            user, daily_log, historical_data, routine_entries,
+            correlations=load_feedback_correlations(user)
+        )
         
-        # Call OpenAI
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+        # Call OpenAI (identical prompts are answered from the cache)
+        feedback_text = chat_completion(
+            system_prompt,
+            user_prompt,
             temperature=0.7,
+            model=current_app.config['LLM_FEEDBACK_MODEL'],
             max_tokens=500
         )
-        
-        feedback_text = response.choices[0].message.content
+        if not feedback_text:
+            raise ValueError('Empty completion')
         
         return {
             'feedback_text': feedback_text,
@@ -67,7 +87,7 @@ def generate_ai_feedback_openai(user, daily_log, historical_data, routine_entrie
         }
     
     except Exception as e:
-        print(f"OpenAI API error: {e}")
+        current_app.logger.warning(f"OpenAI API error: {e}")
         # Fall back to rule-based if API fails
         return generate_ai_feedback_rule_based(user, daily_log, historical_data, routine_entries)
 
@@ -131,40 +151,35 @@ def get_biggest_miss(routine_entries):
         return None
     return max(missed, key=lambda e: e.routine.priority).routine.name
 
-def analyze_historical_performance(user, all_logs):
+def analyze_historical_performance(user):
     """
     Analyze user's performance across all logged days.
     Returns patterns like: streak routines, weak routines, mood trends, etc.
+    Reads the incrementally maintained aggregates, so the cost does not grow with history.
     """
-    if not all_logs:
+    user_stats, routine_rows = load_historical_stats(user.id)
+    if not user_stats.days_logged:
         return {}
     
     # Track routine completion rates across all logs
     routine_stats = {}
-    all_routines = Routine.query.filter_by(user_id=user.id).all()
-    
-    for routine in all_routines:
-        entries = RoutineEntry.query.filter_by(routine_id=routine.id).all()
-        if entries:
-            completed = len([e for e in entries if e.status == 'completed'])
-            completion_rate = (completed / len(entries)) * 100
-            routine_stats[routine.name] = {
-                'completion_rate': completion_rate,
-                'total_attempts': len(entries),
-                'completed': completed
-            }
+    for name, total_attempts, completed in routine_rows:
+        routine_stats[name] = {
+            'completion_rate': (completed / total_attempts) * 100,
+            'total_attempts': total_attempts,
+            'completed': completed
+        }
     
     # Calculate mood and stress trends
-    moods = [log.mood for log in all_logs if log.mood]
-    stresses = [log.stress_level for log in all_logs if log.stress_level]
-    energies = [log.energy_level for log in all_logs if log.energy_level]
+    def average(total, count):
+        return total / count if count else None
     
     return {
         'routine_stats': routine_stats,
-        'average_mood': sum(moods) / len(moods) if moods else None,
-        'average_stress': sum(stresses) / len(stresses) if stresses else None,
-        'average_energy': sum(energies) / len(energies) if energies else None,
-        'total_days_logged': len(all_logs),
+        'average_mood': average(user_stats.mood_sum, user_stats.mood_count),
+        'average_stress': average(user_stats.stress_sum, user_stats.stress_count),
+        'average_energy': average(user_stats.energy_sum, user_stats.energy_count),
+        'total_days_logged': user_stats.days_logged,
         'best_routine': max(routine_stats.items(), key=lambda x: x[1]['completion_rate'])[0] if routine_stats else None,
         'worst_routine': min(routine_stats.items(), key=lambda x: x[1]['completion_rate'])[0] if routine_stats else None
     }
@@ -172,27 +187,34 @@ def analyze_historical_performance(user, all_logs):
 def generate_mentor_feedback(compliance_rate, mood, energy, stress,
                             top_performer, biggest_miss, user_name, historical_data=None):
     """Generate balanced mentor feedback based on historical context"""
+    return " ".join(iter_mentor_feedback(
+        compliance_rate, mood, energy, stress,
+        top_performer, biggest_miss, user_name, historical_data
+    ))
+
+def iter_mentor_feedback(compliance_rate, mood, energy, stress,
+                         top_performer, biggest_miss, user_name, historical_data=None):
+    """Yield the sentences of the rule-based mentor feedback one at a time"""
 
-    feedback_parts = []
     historical_data = historical_data or {}
 
     # Opening based on today's compliance
     if compliance_rate >= 80:
-        feedback_parts.append(f"Great work, {user_name}! You achieved {compliance_rate:.0f}% compliance today.")
+        yield f"Great work, {user_name}! You achieved {compliance_rate:.0f}% compliance today."
     elif compliance_rate >= 50:
-        feedback_parts.append(f"You're at {compliance_rate:.0f}% compliance, {user_name}. There's room to improve.")
+        yield f"You're at {compliance_rate:.0f}% compliance, {user_name}. There's room to improve."
     else:
-        feedback_parts.append(f"You're at {compliance_rate:.0f}% compliance. Let's figure out what got in the way.")
+        yield f"You're at {compliance_rate:.0f}% compliance. Let's figure out what got in the way."
     
     # Add observations from today
     if mood <= 3:
-        feedback_parts.append(f"I notice your mood is low today. This might be affecting your routines.")
+        yield f"I notice your mood is low today. This might be affecting your routines."
     
     if stress >= 8:
-        feedback_parts.append(f"Your stress is high. Remember, perfect execution when stressed is still an achievement.")
+        yield f"Your stress is high. Remember, perfect execution when stressed is still an achievement."
     
     if energy <= 3:
-        feedback_parts.append(f"Your energy is low. Rest is also important. Don't burn out.")
+        yield f"Your energy is low. Rest is also important. Don't burn out."
     
     # Add historical context
     if historical_data:
@@ -205,24 +227,22 @@ def generate_mentor_feedback(compliance_rate, mood, energy, stress,
             avg_compliance = sum(all_rates) / len(all_rates) if all_rates else None
         
         if best_routine and best_routine != top_performer:
-            feedback_parts.append(f"Historically, '{best_routine}' is your strongest routine (high completion rate)—keep up that momentum!")
+            yield f"Historically, '{best_routine}' is your strongest routine (high completion rate)—keep up that momentum!"
         
         if worst_routine and worst_routine != biggest_miss:
-            feedback_parts.append(f"'{worst_routine}' has been a struggle historically. Consider breaking it into smaller chunks or scheduling it at peak energy times.")
+            yield f"'{worst_routine}' has been a struggle historically. Consider breaking it into smaller chunks or scheduling it at peak energy times."
         
         if avg_compliance:
             trend = "improving 📈" if compliance_rate > avg_compliance else "dipping 📉" if compliance_rate < avg_compliance else "consistent"
-            feedback_parts.append(f"Your average compliance is {avg_compliance:.0f}%, and today you're {trend}.")
+            yield f"Your average compliance is {avg_compliance:.0f}%, and today you're {trend}."
     
     # Highlight top performer today
     if top_performer and compliance_rate >= 50:
-        feedback_parts.append(f"Good: You crushed '{top_performer}' today.")
+        yield f"Good: You crushed '{top_performer}' today."
     
     # Address biggest miss
     if biggest_miss and compliance_rate < 80:
-        feedback_parts.append(f"You missed '{biggest_miss}' today. What got in the way?")
-    
-    return " ".join(feedback_parts)
+        yield f"You missed '{biggest_miss}' today. What got in the way?"
 
 def generate_suggestions(compliance_rate, energy, stress, routine_entries, historical_data=None):
     """Generate actionable suggestions based on today and history"""
@@ -257,6 +277,99 @@ def generate_suggestions(compliance_rate, energy, stress, routine_entries, histo
     
     return suggestions
 
+def save_feedback(user, daily_log, feedback_data):
+    """Create the Feedback row for generated feedback data (caller commits)"""
+    suggestions = feedback_data['suggestions']
+    feedback = Feedback(
+        user_id=user.id,
+        daily_log_id=daily_log.id,
+        feedback_text=feedback_data['feedback_text'],
+        routine_compliance_rate=feedback_data['routine_compliance_rate'],
+        top_performer=feedback_data['top_performer'],
+        biggest_miss=feedback_data['biggest_miss'],
+        suggestions='\n'.join(suggestions) if isinstance(suggestions, list) else suggestions
+    )
+    db.session.add(feedback)
+    return feedback
+
+def serialize_feedback(feedback):
+    """Feedback fields returned by the generate/get endpoints"""
+    return {
+        'id': feedback.id,
+        'feedback_text': feedback.feedback_text,
+        'routine_compliance_rate': feedback.routine_compliance_rate,
+        'top_performer': feedback.top_performer,
+        'biggest_miss': feedback.biggest_miss,
+        'suggestions': feedback.suggestions,
+        'created_at': feedback.created_at.isoformat()
+    }
+
+def run_feedback_job(job):
+    """Job handler: generate and persist feedback for the job's daily log"""
+    existing_feedback = Feedback.query.filter_by(daily_log_id=job.daily_log_id).first()
+    if existing_feedback:
+        return existing_feedback
+    
+    user = db.session.get(User, job.user_id)
+    daily_log = db.session.get(DailyLog, job.daily_log_id)
+    feedback_data = generate_ai_feedback(user, daily_log)
+    return save_feedback(user, daily_log, feedback_data)
+
+def find_or_create_feedback_job(user_id, log_id):
+    """
+    Return (job, created) for a log: an in-flight job is reused rather than
+    generating twice, and a stale one (its worker died) is requeued and
+    returned as created. A new or requeued job is only added to the session;
+    the caller commits and then enqueues it.
+    """
+    job = FeedbackJob.query.filter(
+        FeedbackJob.daily_log_id == log_id,
+        FeedbackJob.status.in_(ACTIVE_STATUSES)
+    ).order_by(FeedbackJob.id.desc()).first()
+    if job and is_stale(job):
+        job.status = 'queued'
+        return job, True
+    if job:
+        return job, False
+    job = FeedbackJob(user_id=user_id, daily_log_id=log_id, status='queued')
+    db.session.add(job)
+    return job, True
+
+def pending_feedback_logs(log_date):
+    """Query for daily logs on a date that have no Feedback row yet"""
+    return DailyLog.query.outerjoin(Feedback, Feedback.daily_log_id == DailyLog.id).filter(
+        DailyLog.log_date == log_date,
+        Feedback.id.is_(None)
+    )
+
+def generate_feedback_for_users(user_ids, log_date, chunk_size=50):
+    """
+    Generate feedback for every pending log of the given users on log_date.
+    Commits every chunk_size logs; a failing log is rolled back on its own.
+
+    Returns:
+        Dict with 'processed' count and 'failures' list of (log_id, error)
+    """
+    processed = 0
+    failures = []
+    logs = pending_feedback_logs(log_date).filter(
+        DailyLog.user_id.in_(user_ids)
+    ).options(joinedload(DailyLog.user)).order_by(DailyLog.user_id, DailyLog.id).all()
+    
+    for i, log in enumerate(logs, start=1):
+        try:
+            with db.session.begin_nested():
+                feedback_data = generate_ai_feedback(log.user, log)
+                save_feedback(log.user, log, feedback_data)
+            processed += 1
+        except Exception as e:
+            failures.append((log.id, str(e)))
+        if i % chunk_size == 0:
+            db.session.commit()
+    
+    db.session.commit()
+    return {'processed': processed, 'failures': failures}
+
 @feedback_bp.route('/daily/<int:log_id>', methods=['GET'])
 @token_required
 def get_feedback(current_user, log_id):
@@ -275,21 +388,13 @@ def get_feedback(current_user, log_id):
     db.session.commit()
     
     return jsonify({
-        'feedback': {
-            'id': feedback.id,
-            'feedback_text': feedback.feedback_text,
-            'routine_compliance_rate': feedback.routine_compliance_rate,
-            'top_performer': feedback.top_performer,
-            'biggest_miss': feedback.biggest_miss,
-            'suggestions': feedback.suggestions,
-            'created_at': feedback.created_at.isoformat()
-        }
+        'feedback': serialize_feedback(feedback)
     }), 200
 
 @feedback_bp.route('/generate/<int:log_id>', methods=['POST'])
 @token_required
 def generate_feedback(current_user, log_id):
-    """Generate feedback for a daily log"""
+    """Queue feedback generation for a daily log; poll the returned job for the result"""
     log = DailyLog.query.filter_by(id=log_id, user_id=current_user.id).first()
     
     if not log:
@@ -300,53 +405,144 @@ def generate_feedback(current_user, log_id):
     if existing_feedback:
         return jsonify({
             'message': 'Feedback already exists for this log',
-            'feedback': {
-                'id': existing_feedback.id,
-                'feedback_text': existing_feedback.feedback_text,
-                'routine_compliance_rate': existing_feedback.routine_compliance_rate,
-                'top_performer': existing_feedback.top_performer,
-                'biggest_miss': existing_feedback.biggest_miss,
-                'suggestions': existing_feedback.suggestions,
-                'created_at': existing_feedback.created_at.isoformat()
-            }
+            'feedback': serialize_feedback(existing_feedback)
         }), 200
     
-    # Generate feedback
-    feedback_data = generate_ai_feedback(current_user, log)
+    job, created = find_or_create_feedback_job(current_user.id, log_id)
+    if created:
+        db.session.commit()
+        enqueue_job(current_app._get_current_object(), job.id, run_feedback_job)
+        db.session.refresh(job)
+    
+    response = jsonify({
+        'message': 'Feedback generation queued',
+        'job': serialize_job(job)
+    })
+    response.headers['Location'] = url_for('feedback.get_feedback_job', job_id=job.id)
+    return response, 202
+
+@feedback_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@token_claims_required
+def get_feedback_job(current_user, job_id):
+    """Get the status of a feedback generation job"""
+    job = FeedbackJob.query.filter_by(id=job_id, user_id=current_user.id).first()
     
-    feedback = Feedback(
-        user_id=current_user.id,
-        daily_log_id=log_id,
-        feedback_text=feedback_data['feedback_text'],
-        routine_compliance_rate=feedback_data['routine_compliance_rate'],
-        top_performer=feedback_data['top_performer'],
-        biggest_miss=feedback_data['biggest_miss'],
-        suggestions='\n'.join(feedback_data['suggestions']) if isinstance(feedback_data['suggestions'], list) else feedback_data['suggestions']
-    )
+    if not job:
+        return jsonify({'message': 'Job not found'}), 404
     
-    db.session.add(feedback)
-    db.session.commit()
+    body = {'job': serialize_job(job)}
+    if job.status == 'succeeded' and job.feedback:
+        body['feedback'] = serialize_feedback(job.feedback)
     
-    return jsonify({
-        'message': 'Feedback generated successfully',
-        'feedback': {
-            'id': feedback.id,
-            'feedback_text': feedback.feedback_text,
-            'routine_compliance_rate': feedback.routine_compliance_rate,
-            'top_performer': feedback.top_performer,
-            'biggest_miss': feedback.biggest_miss,
-            'suggestions': feedback.suggestions,
-            'created_at': feedback.created_at.isoformat()
-        }
-    }), 201
+    return jsonify(body), 200
 
-@feedback_bp.route('', methods=['GET'])
+def _sse(event, data):
+    """Format one Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@feedback_bp.route('/stream/<int:log_id>', methods=['GET'])
 @token_required
+def stream_feedback(current_user, log_id):
+    """
+    Stream feedback for a daily log as Server-Sent Events.
+    Emits 'token' events with text as it is generated, then a 'done' event with
+    the persisted feedback (or an 'error' event if generation failed mid-stream).
+    """
+    log = DailyLog.query.filter_by(id=log_id, user_id=current_user.id).first()
+    
+    if not log:
+        return jsonify({'message': 'Daily log not found'}), 404
+    
+    def events():
+        existing_feedback = Feedback.query.filter_by(daily_log_id=log_id).first()
+        if existing_feedback:
+            yield _sse('done', {'feedback': serialize_feedback(existing_feedback)})
+            return
+        
+        routine_entries = load_routine_entries(log)
+        historical_data = analyze_historical_performance(current_user)
+        compliance_rate = calculate_compliance_rate(routine_entries)
+        top_performer = get_top_performer(routine_entries)
+        biggest_miss = get_biggest_miss(routine_entries)
+        energy = log.energy_level or 5
+        stress = log.stress_level or 5
+        
+        parts = []
+        if llm_available():
+            try:
+                for delta in stream_chat_completion(
+                    DEFAULT_FEEDBACK_SYSTEM_PROMPT,
+                    build_feedback_prompt(
+                        current_user, log, historical_data, routine_entries,
+                        correlations=load_feedback_correlations(current_user)
+                    ),
+                    temperature=0.7,
+                    model=current_app.config['LLM_FEEDBACK_MODEL'],
+                    max_tokens=500
+                ):
+                    parts.append(delta)
+                    yield _sse('token', {'text': delta})
+            except Exception as e:
+                current_app.logger.warning(f"OpenAI streaming error: {e}")
+                if parts:
+                    # Text already reached the client; don't splice in a different answer
+                    yield _sse('error', {'message': 'Feedback generation was interrupted'})
+                    return
+        
+        if not parts:
+            # Rule-based fallback streams one sentence at a time
+            for i, sentence in enumerate(iter_mentor_feedback(
+                compliance_rate=compliance_rate,
+                mood=log.mood or 5,
+                energy=energy,
+                stress=stress,
+                top_performer=top_performer,
+                biggest_miss=biggest_miss,
+                user_name=current_user.first_name or current_user.username,
+                historical_data=historical_data
+            )):
+                delta = sentence if i == 0 else ' ' + sentence
+                parts.append(delta)
+                yield _sse('token', {'text': delta})
+        
+        feedback = save_feedback(current_user, log, {
+            'feedback_text': ''.join(parts),
+            'routine_compliance_rate': compliance_rate,
+            'top_performer': top_performer,
+            'biggest_miss': biggest_miss,
+            'suggestions': generate_suggestions(compliance_rate, energy, stress, routine_entries, historical_data)
+        })
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request persisted feedback for this log while we were streaming
+            db.session.rollback()
+            feedback = Feedback.query.filter_by(daily_log_id=log_id).first()
+        
+        yield _sse('done', {'feedback': serialize_feedback(feedback)})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@feedback_bp.route('', methods=['GET'])
+@token_claims_required
+@conditional_get('feedback')
 def get_all_feedback(current_user):
-    """Get all feedback for current user"""
-    feedbacks = Feedback.query.filter_by(user_id=current_user.id).order_by(Feedback.created_at.desc()).all()
+    """Get a page of feedback for current user, newest first"""
+    try:
+        page = parse_page_args()
+        query = filter_date_range(
+            Feedback.query.filter_by(user_id=current_user.id).options(joinedload(Feedback.daily_log)),
+            Feedback.created_at, page['from'], page['to']
+        )
+        feedbacks, next_cursor = keyset_page(query, Feedback.created_at, Feedback.id, page['limit'], page['cursor'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
+        'next_cursor': next_cursor,
         'feedback_history': [{
             'id': f.id,
             'log_date': f.daily_log.log_date.isoformat(),
@@ -358,3 +554,58 @@ def get_all_feedback(current_user):
             'created_at': f.created_at.isoformat()
         } for f in feedbacks]
     }), 200
+
+
+@feedback_bp.cli.command('rebuild-stats')
+@click.option('--user-id', type=int, default=None, help='Only rebuild aggregates for this user.')
+def rebuild_stats_command(user_id):
+    """Backfill routine_stats and user_stats from the full log history."""
+    processed = rebuild_all_stats(user_id)
+    click.echo(f"Rebuilt historical stats for {processed} user(s)")
+
+@feedback_bp.cli.command('run-jobs')
+def run_jobs_command():
+    """Process queued feedback jobs in this process (e.g. after a restart)."""
+    processed = drain_queued_jobs(current_app._get_current_object(), run_feedback_job)
+    click.echo(f"Processed {processed} queued feedback job(s)")
+
+@feedback_bp.cli.command('generate-batch')
+@click.option('--date', 'log_date', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Log date to generate feedback for (default: today).')
+@click.option('--workers', type=int, default=4, show_default=True, help='Worker processes.')
+@click.option('--chunk-size', type=int, default=50, show_default=True, help='Logs per commit.')
+def generate_batch_command(log_date, workers, chunk_size):
+    """Generate feedback for every daily log on a date that has none yet."""
+    log_date = log_date.date() if log_date else date.today()
+    
+    pending = dict(
+        pending_feedback_logs(log_date).with_entities(
+            DailyLog.user_id, func.count(DailyLog.id)
+        ).group_by(DailyLog.user_id).all()
+    )
+    total = sum(pending.values())
+    if not total:
+        click.echo(f"No daily logs without feedback on {log_date.isoformat()}")
+        return
+    
+    if workers > 1 and db.engine.dialect.name == 'sqlite':
+        click.echo("Warning: SQLite allows a single writer; parallel workers will contend for the lock", err=True)
+    
+    # Release this process's connection before the workers start hammering the DB
+    db.session.remove()
+    
+    click.echo(f"Generating feedback for {total} log(s) from {len(pending)} user(s) with {workers} worker(s)")
+    started = time.perf_counter()
+    processed = 0
+    failures = []
+    partitions = partition(pending, workers)
+    for result in run_partitioned(generate_feedback_for_users, partitions, workers, log_date, chunk_size):
+        processed += result['processed']
+        failures.extend(result['failures'])
+        click.echo(f"  {processed + len(failures)}/{total} done")
+    elapsed = time.perf_counter() - started
+    
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    click.echo(f"Generated {processed} feedback row(s) in {elapsed:.1f}s ({rate:.2f} logs/sec), {len(failures)} failure(s)")
+    for log_id, error in failures:
+        click.echo(f"  log {log_id}: {error}", err=True)
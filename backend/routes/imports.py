@@ -0,0 +1,324 @@
+from flask import Blueprint, request, jsonify, current_app
+from models import db, User, Routine, DailyLog, RoutineEntry
+from routes.auth import token_required
+from routes.daily_logs import ENTRY_FIELDS
+from etags import bump_collection_versions
+from changes import next_change_seq
+from stats import rebuild_user_stats
+from streaks import rebuild_user_streaks
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from datetime import date
+import click
+import csv
+import io
+import json
+import time
+
+import_bp = Blueprint('import', __name__, url_prefix='/api/import')
+
+LOG_FIELDS = ('mood', 'energy_level', 'stress_level', 'notes', 'highlights', 'challenges')
+ENTRY_STATUSES = ('completed', 'partial', 'skipped', 'not_done')
+
+# Integer fields and their allowed ranges
+INT_RANGES = {
+    'mood': (1, 10),
+    'energy_level': (1, 10),
+    'stress_level': (1, 10),
+    'difficulty_felt': (1, 10),
+    'completion_percentage': (0, 100),
+    'actual_duration': (0, 24 * 60),
+}
+
+def iter_ndjson(stream):
+    """(line number, record dict) per non-blank NDJSON line; malformed lines yield a ValueError"""
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, ValueError('Invalid JSON')
+            continue
+        yield number, record if isinstance(record, dict) else ValueError('Each line must be a JSON object')
+
+def iter_csv(stream):
+    """(line number, record dict) per CSV row; empty cells are treated as absent"""
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, {key: value for key, value in record.items() if key and value not in (None, '')}
+
+def _int_field(record, field):
+    value = record[field]
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f'{field} must be an integer')
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an integer')
+    low, high = INT_RANGES[field]
+    if not low <= value <= high:
+        raise ValueError(f'{field} must be between {low} and {high}')
+    return value
+
+def _fields(record, names):
+    """Validated values of the given fields that the record provides"""
+    values = {}
+    for field in names:
+        if field not in record:
+            continue
+        if field in INT_RANGES:
+            values[field] = _int_field(record, field)
+        elif field == 'status':
+            if record[field] not in ENTRY_STATUSES:
+                raise ValueError(f"status must be one of {', '.join(ENTRY_STATUSES)}")
+            values[field] = record[field]
+        else:
+            values[field] = None if record[field] is None else str(record[field])
+    return values
+
+def parse_record(record, routine_ids):
+    """
+    Validate one import record.
+
+    A record is a routine entry if its type is 'routine_entry' (or, without a type,
+    if it names a routine) and a daily log otherwise.
+
+    Returns:
+        ('log', log_date, fields) or ('entry', log_date, routine_id, fields)
+    Raises:
+        ValueError with a client-facing message
+    """
+    try:
+        log_date = date.fromisoformat(str(record.get('log_date', '')))
+    except ValueError:
+        raise ValueError('log_date is required (YYYY-MM-DD)')
+
+    record_type = record.get('type') or ('routine_entry' if record.get('routine') else 'daily_log')
+    if record_type == 'daily_log':
+        return 'log', log_date, _fields(record, LOG_FIELDS)
+    if record_type == 'routine_entry':
+        name = str(record.get('routine') or '').strip()
+        if not name:
+            raise ValueError('routine is required for routine entries')
+        routine_id = routine_ids.get(name.lower())
+        if routine_id is None:
+            raise ValueError(f"Unknown routine '{name}'")
+        return 'entry', log_date, routine_id, _fields(record, ENTRY_FIELDS)
+    raise ValueError("type must be 'daily_log' or 'routine_entry'")
+
+def load_routine_ids(user_id):
+    """Map of lower-cased routine name to id, preferring active and then older routines"""
+    rows = db.session.query(Routine.id, Routine.name).filter(
+        Routine.user_id == user_id
+    ).order_by(Routine.is_active.desc(), Routine.id)
+    routine_ids = {}
+    for routine_id, name in rows:
+        routine_ids.setdefault(name.strip().lower(), routine_id)
+    return routine_ids
+
+def write_import_batch(user_id, logs, entries):
+    """
+    Upsert a batch of logs and entries with a few executemany statements (caller commits).
+
+    Args:
+        logs: {log_date: fields} - log fields to set, days may repeat in entries
+        entries: {(log_date, routine_id): fields}
+    Returns:
+        Counts of created/updated logs and entries
+    """
+    counts = {'logs_created': 0, 'logs_updated': 0, 'entries_created': 0, 'entries_updated': 0}
+    dates = set(logs) | {log_date for log_date, _ in entries}
+    if not dates:
+        return counts
+
+    session = db.session()
+    log_ids = dict(session.query(DailyLog.log_date, DailyLog.id).filter(
+        DailyLog.user_id == user_id,
+        DailyLog.log_date.in_(dates)
+    ))
+    existing_entries = {}
+    if log_ids:
+        existing_entries = {
+            (daily_log_id, routine_id): entry_id
+            for entry_id, daily_log_id, routine_id in session.query(
+                RoutineEntry.id, RoutineEntry.daily_log_id, RoutineEntry.routine_id
+            ).filter(RoutineEntry.daily_log_id.in_(log_ids.values()))
+        }
+
+    # Core-style statements skip the flush hooks, so do their bookkeeping here
+    seq = next_change_seq(session, user_id)
+
+    created_dates = dates - set(log_ids)
+    new_logs = [
+        {'user_id': user_id, 'log_date': log_date, 'change_seq': seq, 'created_seq': seq,
+         **{field: logs.get(log_date, {}).get(field) for field in LOG_FIELDS}}
+        for log_date in sorted(created_dates)
+    ]
+    if new_logs:
+        log_ids.update(session.execute(
+            insert(DailyLog).returning(DailyLog.log_date, DailyLog.id), new_logs
+        ).all())
+        counts['logs_created'] = len(new_logs)
+    changed_logs = [
+        {'id': log_ids[log_date], 'change_seq': seq, **fields}
+        for log_date, fields in logs.items()
+        if fields and log_date not in created_dates
+    ]
+    if changed_logs:
+        session.execute(update(DailyLog), changed_logs)
+        counts['logs_updated'] = len(changed_logs)
+
+    new_entries, changed_entries = [], []
+    for (log_date, routine_id), fields in entries.items():
+        entry_id = existing_entries.get((log_ids[log_date], routine_id))
+        if entry_id is None:
+            new_entries.append({
+                'daily_log_id': log_ids[log_date], 'routine_id': routine_id,
+                'change_seq': seq, 'created_seq': seq,
+                'status': 'not_done', 'completion_percentage': 0, 'actual_duration': None,
+                'difficulty_felt': None, 'notes': '', **fields
+            })
+        elif fields:
+            changed_entries.append({'id': entry_id, 'change_seq': seq, **fields})
+    if new_entries:
+        session.execute(insert(RoutineEntry), new_entries)
+        counts['entries_created'] = len(new_entries)
+    if changed_entries:
+        session.execute(update(RoutineEntry), changed_entries)
+        counts['entries_updated'] = len(changed_entries)
+
+    bump_collection_versions(session, {(user_id, 'daily_logs')})
+    return counts
+
+def import_records(user_id, records, batch_size=500, max_errors=100):
+    """
+    Validate and write (line number, record) pairs in batches, committing each batch.
+
+    Records are consumed lazily, so a stream is never held in memory. Invalid records
+    are skipped and reported; a batch that hits a concurrent write is retried once.
+    Stats and streaks are rebuilt from the imported history at the end.
+
+    Returns:
+        Summary dict with counts, the first max_errors errors and rows/sec
+    """
+    started = time.perf_counter()
+    routine_ids = load_routine_ids(user_id)
+    summary = {'rows': 0, 'logs_created': 0, 'logs_updated': 0, 'entries_created': 0,
+               'entries_updated': 0, 'error_count': 0, 'errors': []}
+    logs, entries = {}, {}
+    pending = 0
+
+    def flush_batch():
+        for attempt in range(2):
+            try:
+                counts = write_import_batch(user_id, logs, entries)
+                db.session.commit()
+                break
+            except IntegrityError:
+                # A log or entry for one of these days was created concurrently; re-read and retry
+                db.session.rollback()
+                if attempt:
+                    raise
+        for key, value in counts.items():
+            summary[key] += value
+        logs.clear()
+        entries.clear()
+
+    for line, record in records:
+        summary['rows'] += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            parsed = parse_record(record, routine_ids)
+        except ValueError as e:
+            summary['error_count'] += 1
+            if len(summary['errors']) < max_errors:
+                summary['errors'].append({'line': line, 'message': str(e)})
+            continue
+
+        if parsed[0] == 'log':
+            logs.setdefault(parsed[1], {}).update(parsed[2])
+        else:
+            entries.setdefault((parsed[1], parsed[2]), {}).update(parsed[3])
+        pending += 1
+        if pending >= batch_size:
+            flush_batch()
+            pending = 0
+    if pending:
+        flush_batch()
+
+    if summary['rows'] > summary['error_count']:
+        rebuild_user_stats(user_id)
+        rebuild_user_streaks(user_id)
+        db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    summary['elapsed_seconds'] = round(elapsed, 3)
+    summary['rows_per_second'] = round(summary['rows'] / elapsed, 1) if elapsed else None
+    return summary
+
+def _is_csv(format_name, content_type):
+    if format_name:
+        return format_name.lower() == 'csv'
+    return bool(content_type) and 'csv' in content_type.lower()
+
+@import_bp.route('', methods=['POST'])
+@token_required
+def import_history(current_user):
+    """
+    Import historical daily logs and routine entries for arbitrary dates.
+    The body is NDJSON (default) or CSV (Content-Type text/csv or ?format=csv);
+    routine entries name their routine, which is matched case-insensitively.
+    """
+    format_name = request.args.get('format')
+    if format_name and format_name.lower() not in ('csv', 'ndjson'):
+        return jsonify({'message': "format must be 'ndjson' or 'csv'"}), 400
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    records = iter_csv(stream) if _is_csv(format_name, request.content_type) else iter_ndjson(stream)
+    summary = import_records(
+        current_user.id, records,
+        batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+        max_errors=current_app.config['IMPORT_MAX_ERRORS']
+    )
+    return jsonify(summary), 200
+
+@import_bp.cli.command('logs')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=int, default=None, help='User to import into.')
+@click.option('--username', default=None, help='User to import into, by username.')
+@click.option('--format', 'format_name', type=click.Choice(['ndjson', 'csv']), default=None,
+              help='Input format (default: from the file extension).')
+@click.option('--batch-size', type=int, default=None, help='Records written per transaction.')
+def import_logs_command(path, user_id, username, format_name, batch_size):
+    """Import daily logs and routine entries from an NDJSON or CSV file"""
+    if user_id is None and username:
+        user = User.query.filter_by(username=username).first()
+        user_id = user.id if user else None
+    elif user_id is not None and db.session.get(User, user_id) is None:
+        user_id = None
+    if user_id is None:
+        raise click.UsageError('Pass the --user-id or --username of an existing user')
+
+    is_csv = _is_csv(format_name or path.rsplit('.', 1)[-1], None)
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        summary = import_records(
+            user_id, iter_csv(stream) if is_csv else iter_ndjson(stream),
+            batch_size=batch_size or current_app.config['IMPORT_BATCH_SIZE'],
+            max_errors=current_app.config['IMPORT_MAX_ERRORS']
+        )
+
+    click.echo(
+        f"Imported {summary['rows'] - summary['error_count']}/{summary['rows']} row(s) in "
+        f"{summary['elapsed_seconds']:.1f}s ({summary['rows_per_second'] or 0:.0f} rows/sec): "
+        f"{summary['logs_created']} log(s) created, {summary['logs_updated']} updated, "
+        f"{summary['entries_created']} entr(ies) created, {summary['entries_updated']} updated"
+    )
+    for error in summary['errors']:
+        click.echo(f"  line {error['line']}: {error['message']}", err=True)
+    if summary['error_count'] > len(summary['errors']):
+        click.echo(f"  ... and {summary['error_count'] - len(summary['errors'])} more error(s)", err=True)
@@ -1,45 +1,88 @@
 from flask import Blueprint, request, jsonify, current_app
-from models import db, Routine, User
-from routes.auth import token_required
-from datetime import datetime
+from models import db, Routine, User, WEEKDAYS, weekday_bit
+from routes.auth import token_required, token_claims_required
+from etags import conditional_get
+from datetime import datetime, date
 from datetime import time as dt_time
 import re
-import os
 import json
+import click
 
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
-
+from llm import chat_completion, llm_available
+from pagination import parse_page_args, filter_date_range, keyset_page
+from streaks import serialize_streak, recompute_routine_streak, rebuild_user_streaks
 from prompts import (
     build_routine_generation_user_prompt,
     DEFAULT_ROUTINE_SYSTEM_PROMPT,
     build_routine_summary_user_prompt,
     ROUTINE_SUMMARY_SYSTEM_PROMPT,
+    build_routine_plan_user_prompt,
+    ROUTINE_PLAN_SYSTEM_PROMPT,
+    ROUTINE_PLAN_SCHEMA,
 )
 
 routines_bp = Blueprint('routines', __name__, url_prefix='/api/routines')
 
+def serialize_routine(r):
+    """Routine fields returned by the list/detail/update endpoints"""
+    return {
+        'id': r.id,
+        'name': r.name,
+        'description': r.description,
+        'category': r.category,
+        'frequency': r.frequency,
+        'selected_days': r.selected_days,
+        'days_mask': r.days_mask,
+        'target_duration': r.target_duration,
+        'priority': r.priority,
+        'is_active': r.is_active,
+        **serialize_streak(r),
+        'created_at': r.created_at.isoformat() if r.created_at else None,
+        'updated_at': r.updated_at.isoformat() if r.updated_at else None
+    }
+
 @routines_bp.route('', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('routines')
 def get_routines(current_user):
-    """Get all routines for current user"""
-    routines = Routine.query.filter_by(user_id=current_user.id, is_active=True).all()
+    """Get a page of active routines for current user, oldest first"""
+    try:
+        page = parse_page_args()
+        query = filter_date_range(
+            Routine.query.filter_by(user_id=current_user.id, is_active=True),
+            Routine.created_at, page['from'], page['to']
+        )
+        routines, next_cursor = keyset_page(
+            query, Routine.created_at, Routine.id, page['limit'], page['cursor'], descending=False
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify({
-        'routines': [{
-            'id': r.id,
-            'name': r.name,
-            'description': r.description,
-            'category': r.category,
-            'frequency': r.frequency,
-            'selected_days': r.selected_days,
-            'target_duration': r.target_duration,
-            'priority': r.priority,
-            'is_active': r.is_active,
-            'created_at': r.created_at.isoformat()
-        } for r in routines]
+        'next_cursor': next_cursor,
+        'routines': [serialize_routine(r) for r in routines]
+    }), 200
+
+@routines_bp.route('/due', methods=['GET'])
+@token_claims_required
+@conditional_get('routines')
+def get_due_routines(current_user):
+    """Get active routines scheduled on a date (default today), resolved with one bitmask filter"""
+    try:
+        day = date.fromisoformat(request.args['date']) if request.args.get('date') else date.today()
+    except ValueError:
+        return jsonify({'message': 'Invalid date format (use YYYY-MM-DD)'}), 400
+    
+    routines = Routine.query.filter(
+        Routine.user_id == current_user.id,
+        Routine.is_active == True,
+        Routine.days_mask.op('&')(weekday_bit(day)) != 0
+    ).order_by(Routine.priority.desc(), Routine.id).all()
+    
+    return jsonify({
+        'date': day.isoformat(),
+        'weekday': WEEKDAYS[day.weekday()],
+        'routines': [serialize_routine(r) for r in routines]
     }), 200
 
 @routines_bp.route('', methods=['POST'])
@@ -85,25 +128,30 @@ def create_routine(current_user):
     }), 201
 
 @routines_bp.route('/<int:routine_id>', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('routines')
 def get_routine(current_user, routine_id):
     """Get specific routine"""
     routine = Routine.query.filter_by(id=routine_id, user_id=current_user.id).first()
     
+    if not routine:
+        return jsonify({'message': 'Routine not found'}), 404
+    
+    return jsonify(serialize_routine(routine)), 200
+
+@routines_bp.route('/<int:routine_id>/streak', methods=['GET'])
+@token_claims_required
+@conditional_get('routines')
+def get_routine_streak(current_user, routine_id):
+    """Get a routine's current and longest completion streak"""
+    routine = Routine.query.filter_by(id=routine_id, user_id=current_user.id).first()
+    
     if not routine:
         return jsonify({'message': 'Routine not found'}), 404
     
     return jsonify({
-        'id': routine.id,
-        'name': routine.name,
-        'description': routine.description,
-        'category': routine.category,
-        'frequency': routine.frequency,
-        'selected_days': routine.selected_days,
-        'target_duration': routine.target_duration,
-        'priority': routine.priority,
-        'is_active': routine.is_active,
-        'created_at': routine.created_at.isoformat()
+        'routine_id': routine.id,
+        **serialize_streak(routine)
     }), 200
 
 @routines_bp.route('/<int:routine_id>', methods=['PUT'])
@@ -127,6 +175,8 @@ def update_routine(current_user, routine_id):
         routine.frequency = data['frequency']
     if 'selected_days' in data:
         routine.selected_days = data['selected_days']
+        # Streaks depend on which days are scheduled
+        recompute_routine_streak(routine)
     if 'target_duration' in data:
         routine.target_duration = data['target_duration']
     if 'priority' in data:
@@ -138,18 +188,7 @@ def update_routine(current_user, routine_id):
     
     return jsonify({
         'message': 'Routine updated successfully',
-        'routine': {
-            'id': routine.id,
-            'name': routine.name,
-            'description': routine.description,
-            'category': routine.category,
-            'frequency': routine.frequency,
-            'selected_days': routine.selected_days,
-            'target_duration': routine.target_duration,
-            'priority': routine.priority,
-            'is_active': routine.is_active,
-            'created_at': routine.created_at.isoformat()
-        }
+        'routine': serialize_routine(routine)
     }), 200
 
 @routines_bp.route('/<int:routine_id>', methods=['DELETE'])
@@ -189,10 +228,6 @@ def generate_ai_routines(current_user):
     suggestions = []
     used_llm_generation = False
 
-    api_key = os.getenv('OPENAI_API_KEY')
-    model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-    base_url = os.getenv('OPENAI_BASE_URL')
-
     def _normalize_routine_obj(obj):
         # Parse HH:MM times if present
         start_str = (obj.get('start_time') or '').strip() if isinstance(obj, dict) else ''
@@ -225,27 +260,40 @@ def generate_ai_routines(current_user):
             'end_time': end_time,
         }
 
-    if api_key and OpenAI is not None:
-        try:
-            client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
-            user_prompt = build_routine_generation_user_prompt(
-                current_user,
-                goals,
-                challenges,
-                unavailable_times,
-                desired,
-            )
-            # Request JSON object with key "routines"
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": DEFAULT_ROUTINE_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.6,
-            )
+    # In 'single' mode one structured call returns both the routines and the summary
+    single_call = current_app.config.get('ROUTINE_GENERATION_MODE') == 'single'
+    summary_text = None
+    used_llm_summary = False
 
-            content = completion.choices[0].message.content if completion.choices else None
+    if llm_available():
+        try:
+            if single_call:
+                user_prompt = build_routine_plan_user_prompt(
+                    current_user,
+                    goals,
+                    challenges,
+                    unavailable_times,
+                    desired,
+                )
+                content = chat_completion(
+                    ROUTINE_PLAN_SYSTEM_PROMPT,
+                    user_prompt,
+                    temperature=0.6,
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {"name": "routine_plan", "strict": True, "schema": ROUTINE_PLAN_SCHEMA},
+                    },
+                )
+            else:
+                user_prompt = build_routine_generation_user_prompt(
+                    current_user,
+                    goals,
+                    challenges,
+                    unavailable_times,
+                    desired,
+                )
+                # Request JSON object with key "routines"
+                content = chat_completion(DEFAULT_ROUTINE_SYSTEM_PROMPT, user_prompt, temperature=0.6)
             if content:
                 # Strip triple-backtick fences if present
                 txt = content.strip()
@@ -265,6 +313,9 @@ def generate_ai_routines(current_user):
                     suggestions.append(norm)
                 if suggestions:
                     used_llm_generation = True
+                    if single_call and isinstance(parsed.get('summary'), str) and parsed['summary'].strip():
+                        summary_text = parsed['summary'].strip()
+                        used_llm_summary = True
         except Exception as e:
             # Fall back to heuristics silently
             current_app.logger.info(f"AI routine generation fallback due to error: {e}")
@@ -420,11 +471,8 @@ def generate_ai_routines(current_user):
     db.session.commit()
 
     # Build a concise LLM summary about the user's situation and why these routines
-    summary_text = None
-    used_llm_summary = False
     try:
-        if api_key and OpenAI is not None and created:
-            client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
+        if llm_available() and created and not summary_text:
             # Represent the created routines as dicts for the prompt
             created_dicts = [{
                 'name': r.name,
@@ -433,8 +481,6 @@ def generate_ai_routines(current_user):
                 'frequency': r.frequency,
                 'target_duration': r.target_duration,
                 'priority': r.priority,
-                'start_time': r.start_time.strftime('%H:%M') if r.start_time else None,
-                'end_time': r.end_time.strftime('%H:%M') if r.end_time else None,
             } for r in created]
             summary_user_prompt = build_routine_summary_user_prompt(
                 current_user,
@@ -444,15 +490,7 @@ def generate_ai_routines(current_user):
                 desired,
                 created_dicts,
             )
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": ROUTINE_SUMMARY_SYSTEM_PROMPT},
-                    {"role": "user", "content": summary_user_prompt},
-                ],
-                temperature=0.7,
-            )
-            content = completion.choices[0].message.content if completion.choices else None
+            content = chat_completion(ROUTINE_SUMMARY_SYSTEM_PROMPT, summary_user_prompt, temperature=0.7)
             if content:
                 txt = content.strip()
                 if txt.startswith('```'):
@@ -491,3 +529,19 @@ def generate_ai_routines(current_user):
             'created_at': r.created_at.isoformat(),
         } for r in created]
     }), 201
+
+
+@routines_bp.cli.command('backfill-streaks')
+@click.option('--user-id', type=int, default=None, help='Only rebuild streaks for this user.')
+def backfill_streaks_command(user_id):
+    """Recompute routine streaks from history, one pass and one commit per user."""
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+    
+    routines = 0
+    for uid in user_ids:
+        routines += rebuild_user_streaks(uid)
+        db.session.commit()
+    click.echo(f"Rebuilt streaks for {routines} routine(s) of {len(user_ids)} user(s)")
@@ -0,0 +1,111 @@
+from flask import Blueprint, request, jsonify
+from models import db, Routine, DailyLog, RoutineEntry, Feedback
+from routes.auth import token_claims_required
+from routes.routines import serialize_routine
+from changes import current_change_seq, encode_sync_token, decode_sync_token
+
+sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+def serialize_log(log):
+    return {
+        'id': log.id,
+        'log_date': log.log_date.isoformat(),
+        'mood': log.mood,
+        'energy_level': log.energy_level,
+        'stress_level': log.stress_level,
+        'notes': log.notes,
+        'highlights': log.highlights,
+        'challenges': log.challenges,
+        'created_at': _iso(log.created_at),
+        'updated_at': _iso(log.updated_at)
+    }
+
+def serialize_entry(entry):
+    return {
+        'id': entry.id,
+        'daily_log_id': entry.daily_log_id,
+        'routine_id': entry.routine_id,
+        'status': entry.status,
+        'completion_percentage': entry.completion_percentage,
+        'actual_duration': entry.actual_duration,
+        'difficulty_felt': entry.difficulty_felt,
+        'notes': entry.notes,
+        'created_at': _iso(entry.created_at),
+        'updated_at': _iso(entry.updated_at)
+    }
+
+def serialize_feedback_row(f):
+    return {
+        'id': f.id,
+        'daily_log_id': f.daily_log_id,
+        'feedback_text': f.feedback_text,
+        'routine_compliance_rate': f.routine_compliance_rate,
+        'top_performer': f.top_performer,
+        'biggest_miss': f.biggest_miss,
+        'suggestions': f.suggestions,
+        'is_read': f.is_read,
+        'created_at': _iso(f.created_at),
+        'updated_at': _iso(f.updated_at)
+    }
+
+def _split(rows, since, serialize):
+    """Partition changed rows into created/updated relative to the client's token"""
+    created, updated = [], []
+    for row in rows:
+        (created if since is None or row.created_seq > since else updated).append(serialize(row))
+    return {'created': created, 'updated': updated}
+
+@sync_bp.route('', methods=['GET'])
+@token_claims_required
+def sync(current_user):
+    """
+    Return the caller's rows changed since a sync token.
+    Without a token (or with one the server cannot honour) everything is returned
+    and 'full' is true; either way the response carries the token for the next call.
+    """
+    try:
+        since = decode_sync_token(request.args['since'], current_user.id) if request.args.get('since') else None
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Read the high-water mark first: rows committed after this are picked up next time
+    head = current_change_seq(db.session, current_user.id)
+    if since is not None and since > head:
+        since = None
+    after = since if since is not None else -1
+    
+    routines = Routine.query.filter(
+        Routine.user_id == current_user.id,
+        Routine.change_seq > after,
+        Routine.change_seq <= head
+    ).order_by(Routine.change_seq, Routine.id).all()
+    logs = DailyLog.query.filter(
+        DailyLog.user_id == current_user.id,
+        DailyLog.change_seq > after,
+        DailyLog.change_seq <= head
+    ).order_by(DailyLog.change_seq, DailyLog.id).all()
+    entries = RoutineEntry.query.join(DailyLog, DailyLog.id == RoutineEntry.daily_log_id).filter(
+        DailyLog.user_id == current_user.id,
+        RoutineEntry.change_seq > after,
+        RoutineEntry.change_seq <= head
+    ).order_by(RoutineEntry.change_seq, RoutineEntry.id).all()
+    feedback = Feedback.query.filter(
+        Feedback.user_id == current_user.id,
+        Feedback.change_seq > after,
+        Feedback.change_seq <= head
+    ).order_by(Feedback.change_seq, Feedback.id).all()
+    
+    routine_changes = _split([r for r in routines if r.is_active], since, serialize_routine)
+    routine_changes['deactivated'] = [r.id for r in routines if not r.is_active]
+    
+    return jsonify({
+        'token': encode_sync_token(current_user.id, head),
+        'full': since is None,
+        'routines': routine_changes,
+        'daily_logs': _split(logs, since, serialize_log),
+        'routine_entries': _split(entries, since, serialize_entry),
+        'feedback': _split(feedback, since, serialize_feedback_row)
+    }), 200
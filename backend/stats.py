@@ -0,0 +1,199 @@
+"""
+Incrementally maintained aggregates used as historical context for feedback.
+
+Write paths call the record_* helpers inside their own transaction, so the
+aggregates are committed (or rolled back) together with the rows they describe.
+A user without a user_stats row has never been tracked; the first write or read
+for that user rebuilds their aggregates from the full history once.
+"""
+from sqlalchemy import case, func
+from models import db, User, Routine, DailyLog, RoutineEntry, RoutineStats, UserStats
+
+WELLBEING_FIELDS = ('mood', 'energy', 'stress')
+
+def snapshot_log(daily_log):
+    """Return the (mood, energy, stress) values tracked for a daily log"""
+    return (daily_log.mood, daily_log.energy_level, daily_log.stress_level)
+
+def _is_completed(status):
+    return 1 if status == 'completed' else 0
+
+def _ensure_user_stats(user_id):
+    """
+    Return the user's stats row, or None if it had to be rebuilt.
+    A rebuild already reflects every pending change, so callers skip their delta.
+    """
+    user_stats = db.session.get(UserStats, user_id)
+    if user_stats is None:
+        db.session.flush()
+        rebuild_user_stats(user_id)
+        return None
+    return user_stats
+
+def record_log_change(user_id, before, after):
+    """
+    Apply a daily log write to the user's running sums.
+
+    Args:
+        user_id: Owner of the log
+        before: snapshot_log() tuple before the write, or None for a new log
+        after: snapshot_log() tuple after the write
+    """
+    user_stats = _ensure_user_stats(user_id)
+    if user_stats is None:
+        return
+
+    if before is None:
+        user_stats.days_logged = UserStats.days_logged + 1
+        before = (None, None, None)
+
+    for field, old, new in zip(WELLBEING_FIELDS, before, after):
+        if old == new:
+            continue
+        sum_col = getattr(UserStats, f'{field}_sum')
+        count_col = getattr(UserStats, f'{field}_count')
+        sum_delta = (new or 0) - (old or 0)
+        count_delta = (1 if new else 0) - (1 if old else 0)
+        setattr(user_stats, f'{field}_sum', sum_col + sum_delta)
+        if count_delta:
+            setattr(user_stats, f'{field}_count', count_col + count_delta)
+
+    # Flush so the in-place increments compose with later writes in this transaction
+    db.session.flush()
+
+def record_entry_change(user_id, routine_id, before_status, after_status):
+    """
+    Apply a routine entry write to the routine's completion counters.
+
+    Args:
+        user_id: Owner of the routine
+        routine_id: Routine the entry belongs to
+        before_status: Entry status before the write, or None for a new entry
+        after_status: Entry status after the write
+    """
+    record_entry_changes(user_id, [(routine_id, before_status, after_status)])
+
+def record_entry_changes(user_id, changes):
+    """
+    Apply several routine entry writes at once: one lookup for all affected
+    routines' counters and a single flush.
+
+    Args:
+        user_id: Owner of the routines
+        changes: Iterable of (routine_id, before_status, after_status) as in record_entry_change
+    """
+    if _ensure_user_stats(user_id) is None:
+        return
+
+    deltas = {}
+    for routine_id, before_status, after_status in changes:
+        attempts, completed = deltas.get(routine_id, (0, 0))
+        deltas[routine_id] = (
+            attempts + (1 if before_status is None else 0),
+            completed + _is_completed(after_status) - _is_completed(before_status)
+        )
+    deltas = {rid: d for rid, d in deltas.items() if d != (0, 0)}
+    if not deltas:
+        return
+
+    existing = {
+        s.routine_id: s
+        for s in RoutineStats.query.filter(RoutineStats.routine_id.in_(deltas)).all()
+    }
+    for routine_id, (attempts_delta, completed_delta) in deltas.items():
+        routine_stats = existing.get(routine_id)
+        if routine_stats is None:
+            # Tracked users start every routine at zero, so the delta is the total
+            db.session.add(RoutineStats(
+                routine_id=routine_id,
+                user_id=user_id,
+                total_attempts=attempts_delta,
+                completed=completed_delta
+            ))
+        else:
+            routine_stats.total_attempts = RoutineStats.total_attempts + attempts_delta
+            routine_stats.completed = RoutineStats.completed + completed_delta
+
+    # Flush so the in-place increments compose with later writes in this transaction
+    db.session.flush()
+
+def rebuild_user_stats(user_id):
+    """Recompute a user's aggregates from the full history (does not commit)"""
+    def summed(column):
+        # Mirror the truthiness filter used by the feedback averages
+        return (
+            func.coalesce(func.sum(case((column != 0, column), else_=0)), 0),
+            func.coalesce(func.sum(case((column != 0, 1), else_=0)), 0),
+        )
+
+    log_row = db.session.query(
+        func.count(DailyLog.id),
+        *summed(DailyLog.mood),
+        *summed(DailyLog.energy_level),
+        *summed(DailyLog.stress_level)
+    ).filter(DailyLog.user_id == user_id).one()
+
+    user_stats = db.session.get(UserStats, user_id)
+    if user_stats is None:
+        user_stats = UserStats(user_id=user_id)
+        db.session.add(user_stats)
+    (user_stats.days_logged,
+     user_stats.mood_sum, user_stats.mood_count,
+     user_stats.energy_sum, user_stats.energy_count,
+     user_stats.stress_sum, user_stats.stress_count) = (int(v) for v in log_row)
+
+    entry_rows = db.session.query(
+        RoutineEntry.routine_id,
+        func.count(RoutineEntry.id),
+        func.sum(case((RoutineEntry.status == 'completed', 1), else_=0))
+    ).join(Routine, Routine.id == RoutineEntry.routine_id).filter(
+        Routine.user_id == user_id
+    ).group_by(RoutineEntry.routine_id).all()
+    counts = {routine_id: (int(total), int(completed or 0)) for routine_id, total, completed in entry_rows}
+
+    existing = {s.routine_id: s for s in RoutineStats.query.filter_by(user_id=user_id).all()}
+    for routine_id in set(existing) | set(counts):
+        routine_stats = existing.get(routine_id)
+        if routine_stats is None:
+            routine_stats = RoutineStats(routine_id=routine_id, user_id=user_id)
+            db.session.add(routine_stats)
+        routine_stats.total_attempts, routine_stats.completed = counts.get(routine_id, (0, 0))
+
+    db.session.flush()
+    return user_stats
+
+def rebuild_all_stats(user_id=None):
+    """Rebuild aggregates for one user or every user, committing per user. Returns users processed."""
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+
+    for uid in user_ids:
+        rebuild_user_stats(uid)
+        db.session.commit()
+
+    return len(user_ids)
+
+def load_historical_stats(user_id):
+    """
+    Read a user's aggregates with two indexed lookups.
+    An untracked user is rebuilt first; the caller's commit persists the rebuild.
+
+    Returns:
+        (UserStats, list of (routine_name, total_attempts, completed)) ordered by routine id
+    """
+    user_stats = db.session.get(UserStats, user_id)
+    if user_stats is None:
+        user_stats = rebuild_user_stats(user_id)
+
+    routine_rows = db.session.query(
+        Routine.name,
+        RoutineStats.total_attempts,
+        RoutineStats.completed
+    ).join(Routine, Routine.id == RoutineStats.routine_id).filter(
+        RoutineStats.user_id == user_id,
+        RoutineStats.total_attempts > 0
+    ).order_by(RoutineStats.routine_id).all()
+
+    return user_stats, routine_rows
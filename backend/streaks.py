@@ -0,0 +1,113 @@
+"""
+Incrementally maintained completion streaks per routine.
+
+A streak counts completed days in a row, where "in a row" only considers the
+routine's scheduled weekdays (days_mask): an unscheduled day neither breaks a
+streak nor is required to extend it, and completing a routine on an unscheduled
+day still counts. Each routine stores the streak ending at its last completed
+date plus its longest streak. Entry writes that complete a later day extend or
+restart the stored streak in place; anything else (un-completing a day,
+backdated completions, schedule changes) recomputes that routine from its
+history with one query. Whether the stored streak is still alive is decided at
+read time, so missed days never require a write.
+"""
+from datetime import date, timedelta
+from models import db, Routine, DailyLog, RoutineEntry
+
+def _scheduled_between(days_mask, start, end):
+    """True if a day strictly between start and end falls on a scheduled weekday"""
+    gap = (end - start).days - 1
+    if gap <= 0 or not days_mask:
+        return False
+    if gap >= 7:
+        return True
+    return any(days_mask & (1 << (start + timedelta(days=i)).weekday()) for i in range(1, gap + 1))
+
+def effective_current_streak(routine, today=None):
+    """The stored streak if no scheduled day has been missed since, else 0 (today is not yet missed)"""
+    today = today or date.today()
+    if not routine.last_completed_date or not routine.current_streak:
+        return 0
+    if _scheduled_between(routine.days_mask, routine.last_completed_date, today):
+        return 0
+    return routine.current_streak
+
+def serialize_streak(routine, today=None):
+    return {
+        'current_streak': effective_current_streak(routine, today),
+        'longest_streak': routine.longest_streak or 0,
+        'last_completed_date': routine.last_completed_date.isoformat() if routine.last_completed_date else None
+    }
+
+def _apply_history(routine, completed_dates):
+    """Set a routine's streak fields from its ascending, distinct completed dates"""
+    current = longest = 0
+    previous = None
+    for day in completed_dates:
+        if previous is not None and not _scheduled_between(routine.days_mask, previous, day):
+            current += 1
+        else:
+            current = 1
+        longest = max(longest, current)
+        previous = day
+    routine.current_streak = current
+    routine.longest_streak = longest
+    routine.last_completed_date = previous
+
+def recompute_routine_streak(routine):
+    """Recompute one routine's streaks from its full history (one query, does not commit)"""
+    dates = [d for (d,) in db.session.query(DailyLog.log_date).join(
+        RoutineEntry, RoutineEntry.daily_log_id == DailyLog.id
+    ).filter(
+        RoutineEntry.routine_id == routine.id,
+        RoutineEntry.status == 'completed'
+    ).distinct().order_by(DailyLog.log_date)]
+    _apply_history(routine, dates)
+
+def record_entry_streaks(log_date, changes):
+    """
+    Apply routine entry writes on one day to the routines' streaks.
+
+    Args:
+        log_date: Date of the daily log the entries belong to
+        changes: Iterable of (routine_id, before_status, after_status), as for stats.record_entry_changes
+    """
+    flipped = {
+        routine_id: after_status == 'completed'
+        for routine_id, before_status, after_status in changes
+        if (before_status == 'completed') != (after_status == 'completed')
+    }
+    if not flipped:
+        return
+
+    for routine in Routine.query.filter(Routine.id.in_(flipped)).all():
+        last = routine.last_completed_date
+        if flipped[routine.id] and (last is None or log_date > last):
+            # Completing a later day: extend the streak, or restart it after a missed day
+            if last is not None and not _scheduled_between(routine.days_mask, last, log_date):
+                routine.current_streak = (routine.current_streak or 0) + 1
+            else:
+                routine.current_streak = 1
+            routine.last_completed_date = log_date
+            routine.longest_streak = max(routine.longest_streak or 0, routine.current_streak)
+        else:
+            # Backdated completion or a completion undone: the run may change anywhere
+            recompute_routine_streak(routine)
+
+def rebuild_user_streaks(user_id):
+    """Recompute every routine streak of a user in one pass over their history (does not commit)"""
+    routines = Routine.query.filter_by(user_id=user_id).all()
+    dates = {routine.id: [] for routine in routines}
+    rows = db.session.query(RoutineEntry.routine_id, DailyLog.log_date).join(
+        DailyLog, DailyLog.id == RoutineEntry.daily_log_id
+    ).filter(
+        DailyLog.user_id == user_id,
+        RoutineEntry.status == 'completed'
+    ).distinct().order_by(RoutineEntry.routine_id, DailyLog.log_date)
+    for routine_id, log_date in rows:
+        if routine_id in dates:
+            dates[routine_id].append(log_date)
+
+    for routine in routines:
+        _apply_history(routine, dates[routine.id])
+    return len(routines)
@@ -0,0 +1,59 @@
+"""
+Single-statement inserts that defer duplicate detection to unique constraints.
+
+insert_or_ignore() issues INSERT ... ON CONFLICT DO NOTHING RETURNING id on
+PostgreSQL and SQLite, so a create is one round trip and concurrent requests
+cannot both insert the same row. Core inserts skip the ORM flush hooks, so the
+collection version and change sequence bookkeeping they would have done is
+applied here; stats hooks stay with the caller as for ORM writes.
+"""
+from sqlalchemy.exc import IntegrityError
+from models import db
+from etags import bump_collection_versions
+from changes import next_change_seq
+
+def _dialect_insert(dialect_name):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def insert_or_ignore(model, values, conflict_columns, user_id, collection):
+    """
+    Insert one row unless it would violate the unique key on conflict_columns.
+
+    Args:
+        model: Mapped class with an integer `id` and change_seq/created_seq columns
+        values: Column values for the new row
+        conflict_columns: Column names of the unique constraint that defines a duplicate
+        user_id: Owner whose collection version and change sequence advance
+        collection: Collection name for conditional GETs ('daily_logs', ...)
+    Returns:
+        The new row's id, or None if an equivalent row already exists
+    """
+    insert = _dialect_insert(db.session.get_bind().dialect.name)
+    if insert is None:
+        # No native upsert: fall back to an ORM insert inside a savepoint
+        try:
+            with db.session.begin_nested():
+                row = model(**values)
+                db.session.add(row)
+            return row.id
+        except IntegrityError:
+            return None
+
+    session = db.session()
+    seq = next_change_seq(session, user_id)
+    stmt = insert(model).values(
+        **values, change_seq=seq, created_seq=seq
+    ).on_conflict_do_nothing(
+        index_elements=conflict_columns
+    ).returning(model.id)
+    new_id = session.execute(stmt).scalar()
+
+    if new_id is not None:
+        bump_collection_versions(session, {(user_id, collection)})
+    return new_id
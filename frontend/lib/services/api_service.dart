@@ -6,10 +6,19 @@ import 'api_config.dart';
 class ApiService {
   static String get baseUrl => ApiConfig.baseUrl;
 
+  /// Last ETag and decoded body per GET endpoint, for conditional requests
+  static final Map<String, MapEntry<String, dynamic>> _etagCache = {};
+
+  /// Forget cached GET responses (e.g. on logout)
+  static void clearCache() => _etagCache.clear();
+
   /// Make a GET request with authorization
+  ///
+  /// Revalidates with If-None-Match; a 304 returns the previously cached body.
   static Future<dynamic> get(String endpoint) async {
     final token = await AuthService().getToken();
     final url = Uri.parse('$baseUrl$endpoint');
+    final cached = _etagCache[endpoint];
 
     try {
       final response = await http.get(
@@ -17,15 +26,40 @@ class ApiService {
         headers: {
           'Content-Type': 'application/json',
           if (token != null) 'Authorization': 'Bearer $token',
+          if (cached != null) 'If-None-Match': cached.key,
         },
       );
 
-      return _handleResponse(response);
+      if (response.statusCode == 304 && cached != null) {
+        return cached.value;
+      }
+
+      final body = _handleResponse(response);
+      final etag = response.headers['etag'];
+      if (etag != null) {
+        _etagCache[endpoint] = MapEntry(etag, body);
+      }
+      return body;
     } catch (e) {
       throw Exception('Network error: $e');
     }
   }
 
+  /// GET every page of a paginated list endpoint, following `next_cursor`
+  static Future<List<dynamic>> getAllPages(String endpoint, String listKey) async {
+    final items = <dynamic>[];
+    String? cursor;
+    do {
+      final separator = endpoint.contains('?') ? '&' : '?';
+      final page = await get(cursor == null
+          ? endpoint
+          : '$endpoint${separator}cursor=${Uri.encodeQueryComponent(cursor)}');
+      items.addAll(page[listKey] ?? []);
+      cursor = page['next_cursor'];
+    } while (cursor != null);
+    return items;
+  }
+
   /// Make a POST request with authorization
   static Future<dynamic> post(String endpoint, Map<String, dynamic> body) async {
     final token = await AuthService().getToken();
@@ -2,6 +2,8 @@ import 'package:flutter_secure_storage/flutter_secure_storage.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
 import 'api_config.dart';
+import 'api_service.dart';
+import 'sync_service.dart';
 
 class AuthService {
   static String get _authBase => '${ApiConfig.baseUrl}/auth';
@@ -117,7 +119,12 @@ class AuthService {
       );
 
       if (response.statusCode == 200) {
-        return jsonDecode(response.body);
+        final data = jsonDecode(response.body);
+        // The server issues a fresh token carrying the new profile version
+        if (data['token'] != null) {
+          await _storage.write(key: _tokenKey, value: data['token']);
+        }
+        return data;
       } else {
         throw Exception('Failed to update profile');
       }
@@ -152,5 +159,7 @@ class AuthService {
     await _storage.delete(key: _tokenKey);
     await _storage.delete(key: _userIdKey);
     await _storage.delete(key: _usernameKey);
+    ApiService.clearCache();
+    SyncService.reset();
   }
 }
@@ -125,8 +125,7 @@ class DailyLogService {
   /// Get all daily logs
   static Future<List<DailyLog>> getDailyLogs() async {
     try {
-      final response = await ApiService.get('/daily-logs');
-      final List<dynamic> logsList = response['logs'] ?? [];
+      final List<dynamic> logsList = await ApiService.getAllPages('/daily-logs', 'logs');
       return logsList.map((log) => DailyLog.fromJson(log)).toList();
     } catch (e) {
       throw Exception('Failed to get daily logs: $e');
@@ -231,6 +230,55 @@ class DailyLogService {
     }
   }
 
+  /// Create or update many routine entries of a log in one request
+  ///
+  /// Each entry map needs a `routine_id`; returns the per-entry results.
+  static Future<List<dynamic>> saveRoutineEntries({
+    required int logId,
+    required List<Map<String, dynamic>> entries,
+  }) async {
+    try {
+      final response = await ApiService.put('/daily-logs/$logId/routine-entries', {
+        'entries': entries,
+      });
+      return response['results'] ?? [];
+    } catch (e) {
+      throw Exception('Failed to save routine entries: $e');
+    }
+  }
+
+  /// Close today in one request: save the log and its entries, and request feedback
+  ///
+  /// [feedback] is 'async' (queue a job), 'inline' or 'none'. The response holds
+  /// the saved `log`, per-entry `results`, and either `feedback` or a `job` to poll.
+  static Future<Map<String, dynamic>> closeDay({
+    int? mood,
+    int? energyLevel,
+    int? stressLevel,
+    String? notes,
+    String? highlights,
+    String? challenges,
+    List<Map<String, dynamic>> entries = const [],
+    String feedback = 'async',
+  }) async {
+    try {
+      final body = <String, dynamic>{
+        'entries': entries,
+        'feedback': feedback,
+      };
+      if (mood != null) body['mood'] = mood;
+      if (energyLevel != null) body['energy_level'] = energyLevel;
+      if (stressLevel != null) body['stress_level'] = stressLevel;
+      if (notes != null) body['notes'] = notes;
+      if (highlights != null) body['highlights'] = highlights;
+      if (challenges != null) body['challenges'] = challenges;
+
+      return await ApiService.post('/daily-logs/close', body);
+    } catch (e) {
+      throw Exception('Failed to close day: $e');
+    }
+  }
+
   /// Update routine entry
   static Future<void> updateRoutineEntry({
     required int entryId,
@@ -52,11 +52,15 @@ class FeedbackService {
     }
   }
 
-  /// Generate feedback for a daily log
+  /// Generate feedback for a daily log.
+  /// The backend queues generation and returns a job, which is polled until done.
   static Future<MentorFeedback> generateFeedback(int logId) async {
     try {
       final response = await ApiService.post('/feedback/generate/$logId', {});
-      return MentorFeedback.fromJson(response['feedback']);
+      if (response['feedback'] != null) {
+        return MentorFeedback.fromJson(response['feedback']);
+      }
+      return await _waitForJob(response['job']['id']);
     } catch (e) {
       final msg = e.toString();
       if (msg.contains('already exists')) {
@@ -67,11 +71,27 @@ class FeedbackService {
     }
   }
 
+  /// Poll a feedback job until it succeeds or fails
+  static Future<MentorFeedback> _waitForJob(int jobId,
+      {Duration interval = const Duration(seconds: 1), int maxPolls = 60}) async {
+    for (var i = 0; i < maxPolls; i++) {
+      final response = await ApiService.get('/feedback/jobs/$jobId');
+      final status = response['job']['status'];
+      if (status == 'succeeded' && response['feedback'] != null) {
+        return MentorFeedback.fromJson(response['feedback']);
+      }
+      if (status == 'failed') {
+        throw Exception(response['job']['error'] ?? 'Feedback generation failed');
+      }
+      await Future.delayed(interval);
+    }
+    throw Exception('Timed out waiting for feedback');
+  }
+
   /// Get all feedback
   static Future<List<MentorFeedback>> getAllFeedback() async {
     try {
-      final response = await ApiService.get('/feedback');
-      final List<dynamic> feedbackList = response['feedback_history'] ?? [];
+      final List<dynamic> feedbackList = await ApiService.getAllPages('/feedback', 'feedback_history');
       return feedbackList.map((f) => MentorFeedback.fromJson(f)).toList();
     } catch (e) {
       throw Exception('Failed to get feedback: $e');
@@ -71,14 +71,27 @@ class RoutineService {
   /// Get all routines
   static Future<List<Routine>> getRoutines() async {
     try {
-      final response = await ApiService.get('/routines');
-      final List<dynamic> routinesList = response['routines'] ?? [];
+      final List<dynamic> routinesList = await ApiService.getAllPages('/routines', 'routines');
       return routinesList.map((r) => Routine.fromJson(r)).toList();
     } catch (e) {
       throw Exception('Failed to get routines: $e');
     }
   }
 
+  /// Get active routines scheduled on [date] (defaults to today on the server)
+  static Future<List<Routine>> getDueRoutines({DateTime? date}) async {
+    try {
+      final endpoint = date == null
+          ? '/routines/due'
+          : '/routines/due?date=${date.toIso8601String().split('T').first}';
+      final response = await ApiService.get(endpoint);
+      final List<dynamic> routinesList = response['routines'] ?? [];
+      return routinesList.map((r) => Routine.fromJson(r)).toList();
+    } catch (e) {
+      throw Exception('Failed to get due routines: $e');
+    }
+  }
+
   /// Create a new routine
   static Future<Routine> createRoutine({
     required String name,
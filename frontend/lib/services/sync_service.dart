@@ -0,0 +1,73 @@
+import '../services/api_service.dart';
+
+/// Changes to one collection since the last sync
+class SyncChanges {
+  final List<dynamic> created;
+  final List<dynamic> updated;
+  final List<int> deactivated;
+
+  SyncChanges({
+    required this.created,
+    required this.updated,
+    this.deactivated = const [],
+  });
+
+  factory SyncChanges.fromJson(Map<String, dynamic>? json) {
+    return SyncChanges(
+      created: json?['created'] ?? [],
+      updated: json?['updated'] ?? [],
+      deactivated: List<int>.from(json?['deactivated'] ?? []),
+    );
+  }
+
+  bool get isEmpty => created.isEmpty && updated.isEmpty && deactivated.isEmpty;
+}
+
+/// Result of a delta sync; [full] means every row was returned and local
+/// copies should be replaced rather than merged
+class SyncResult {
+  final bool full;
+  final SyncChanges routines;
+  final SyncChanges dailyLogs;
+  final SyncChanges routineEntries;
+  final SyncChanges feedback;
+
+  SyncResult({
+    required this.full,
+    required this.routines,
+    required this.dailyLogs,
+    required this.routineEntries,
+    required this.feedback,
+  });
+}
+
+class SyncService {
+  /// Token from the last successful sync; null until the first one
+  static String? _token;
+
+  /// Fetch everything changed since the last sync
+  static Future<SyncResult> sync() async {
+    try {
+      final endpoint = _token == null
+          ? '/sync'
+          : '/sync?since=${Uri.encodeQueryComponent(_token!)}';
+      final response = await ApiService.get(endpoint);
+      _token = response['token'];
+
+      return SyncResult(
+        full: response['full'] ?? true,
+        routines: SyncChanges.fromJson(response['routines']),
+        dailyLogs: SyncChanges.fromJson(response['daily_logs']),
+        routineEntries: SyncChanges.fromJson(response['routine_entries']),
+        feedback: SyncChanges.fromJson(response['feedback']),
+      );
+    } catch (e) {
+      throw Exception('Failed to sync: $e');
+    }
+  }
+
+  /// Forget the sync position (e.g. on logout) so the next sync is full
+  static void reset() {
+    _token = null;
+  }
+}